@@ -0,0 +1,113 @@
+import os
+import json
+
+# Definición declarativa de las animaciones (animations.json): fotogramas,
+# duración de cada fotograma, si se repite o pasa a otro estado al terminar y
+# cómo se mueve el pingüino. Se compila una sola vez en tablas indexadas por
+# enteros para que el motor no compare cadenas en cada tick.
+
+MANIFEST_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "animations.json")
+
+# Tipos de movimiento
+MOTION_NONE, MOTION_LINEAR, MOTION_ARC, MOTION_BOUNCE = range(4)
+MOTION_TYPES = {
+    "none": MOTION_NONE,
+    "linear": MOTION_LINEAR,  # velocity [vx, vy] en px/s; vx se invierte mirando a la izquierda
+    "arc": MOTION_ARC,  # salto parabólico de `height` px que dura lo que la animación
+    "bounce": MOTION_BOUNCE,  # diagonal aleatoria a `speed` px/s que rebota en los bordes
+}
+
+# Estado siguiente de una animación que se repite
+LOOP = -1
+
+
+class AnimationTable:
+    # Todas las listas se indexan con el id (entero) de la animación
+    def __init__(self, names, initial):
+        self.names = tuple(names)
+        self.ids = {name: i for i, name in enumerate(self.names)}
+        self.initial = self.ids[initial]
+        self.files = []  # nombres de archivo de cada fotograma
+        self.durations = []  # tupla de segundos por fotograma
+        self.cycle_times = []  # suma de las duraciones
+        self.next_state = []  # id del estado al terminar, o LOOP
+        self.motion = []  # MOTION_*
+        self.velocity_x = []
+        self.velocity_y = []
+        self.height = []  # altura del salto (MOTION_ARC)
+        self.speed = []  # velocidad del rebote (MOTION_BOUNCE)
+
+    @property
+    def frame_counts(self):
+        return [len(files) for files in self.files]
+
+    def files_by_name(self):
+        return {name: self.files[i] for i, name in enumerate(self.names)}
+
+
+def frame_files(spec):
+    # Lista explícita o {"pattern": "nombre_{:02d}.png", "count": N, "start": 1}
+    if isinstance(spec, list):
+        return list(spec)
+    start = spec.get("start", 1)
+    return [spec["pattern"].format(i) for i in range(start, start + spec["count"])]
+
+
+def compile_manifest(manifest):
+    animations = manifest["animations"]
+    initial = manifest.get("initial", "idle")
+    if initial not in animations:
+        raise ValueError(f"la animación inicial '{initial}' no está definida")
+    table = AnimationTable(animations, initial)
+
+    for name, spec in animations.items():
+        files = frame_files(spec["frames"])
+        if not files:
+            raise ValueError(f"'{name}' no tiene fotogramas")
+        if "durations" in spec:
+            durations = tuple(float(d) for d in spec["durations"])
+            if len(durations) != len(files):
+                raise ValueError(f"'{name}': {len(durations)} duraciones para {len(files)} fotogramas")
+        else:
+            durations = (float(spec.get("duration", 0.2)),) * len(files)
+        if min(durations) <= 0:
+            raise ValueError(f"'{name}': las duraciones deben ser positivas")
+
+        mode = spec.get("mode", "loop")
+        if mode == "loop":
+            next_state = LOOP
+        elif mode == "once":
+            next_name = spec.get("next", initial)
+            if next_name not in table.ids:
+                raise ValueError(f"'{name}': estado siguiente '{next_name}' desconocido")
+            next_state = table.ids[next_name]
+        else:
+            raise ValueError(f"'{name}': modo '{mode}' desconocido (loop u once)")
+
+        motion = spec.get("motion", {})
+        kind = motion.get("type", "none")
+        if kind not in MOTION_TYPES:
+            raise ValueError(f"'{name}': movimiento '{kind}' desconocido")
+        vx, vy = motion.get("velocity", (0, 0))
+
+        table.files.append(files)
+        table.durations.append(durations)
+        table.cycle_times.append(sum(durations))
+        table.next_state.append(next_state)
+        table.motion.append(MOTION_TYPES[kind])
+        table.velocity_x.append(float(vx))
+        table.velocity_y.append(float(vy))
+        table.height.append(float(motion.get("height", 0)))
+        table.speed.append(float(motion.get("speed", 0)))
+    return table
+
+
+_tables = {}
+
+
+def load_manifest(path=MANIFEST_PATH):
+    # Compilado una vez por proceso y compartido por todos los pingüinos
+    if path not in _tables:
+        with open(path, encoding="utf-8") as f:
+            _tables[path] = compile_manifest(json.load(f))
+    return _tables[path]
@@ -1,30 +1,98 @@
-# rocket_api.py
-# import requests
-# import json
-
-# with open('config.json') as f:
-#     config = json.load(f)
-
-# headers = {
-#     'X-Auth-Token': config['auth_token'],
-#     'X-User-Id': config['user_id']
-# }
-
-# def obtener_mensajes_no_leidos():
-#     endpoint = f"{config['rocket_url']}/api/v1/subscriptions.get"
-#     response = requests.get(endpoint, headers=headers)
-#     data = response.json()
-
-#     mensajes_no_leidos = []
-#     if data.get('success'):
-#         for canal in data['update']:
-#             if canal.get('unread') > 0:
-#                 mensajes_no_leidos.append({
-#                     'nombre': canal.get('name'),
-#                     'mensajes_pendientes': canal.get('unread')
-#                 })
-
-#     return mensajes_no_leidos
-
-# if __name__ == "__main__":
-#     print(obtener_mensajes_no_leidos())
+import json
+import datetime
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Cliente de Rocket.Chat para consultar los mensajes no leídos. No depende de
+# Qt: notifier.py lo usa desde un hilo propio para no bloquear la interfaz.
+
+CONFIG_PATH = "config.json"
+
+
+def load_config(path=CONFIG_PATH):
+    # config.json: {"rocket_url": ..., "auth_token": ..., "user_id": ...}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def iso_timestamp(moment):
+    # Formato que espera updatedSince, p. ej. 2017-11-25T15:08:17.248Z
+    return moment.strftime("%Y-%m-%dT%H:%M:%S.") + f"{moment.microsecond // 1000:03d}Z"
+
+
+def parse_timestamp(value):
+    # _updatedAt del servidor en el mismo formato; None si no lo trae o no se entiende
+    if not isinstance(value, str):
+        return None
+    try:
+        return datetime.datetime.strptime(value, "%Y-%m-%dT%H:%M:%S.%fZ").replace(
+            tzinfo=datetime.timezone.utc)
+    except ValueError:
+        return None
+
+
+class RocketChatClient:
+    def __init__(self, rocket_url, auth_token, user_id, timeout=10):
+        self.endpoint = f"{rocket_url.rstrip('/')}/api/v1/subscriptions.get"
+        self.timeout = timeout
+        # Una sola sesión para todas las consultas: reutiliza la conexión
+        # (keep-alive) en lugar de abrir una nueva en cada sondeo
+        self.session = requests.Session()
+        self.session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=1))
+        self.session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=1))
+        self.session.headers.update({
+            "X-Auth-Token": auth_token,
+            "X-User-Id": user_id,
+        })
+        self.updated_since = None
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(config["rocket_url"], config["auth_token"], config["user_id"])
+
+    def fetch_changes(self):
+        # Devuelve (actualizados, eliminados): {id: {"nombre", "mensajes_pendientes"}}
+        # y la lista de ids de suscripciones eliminadas, solo desde la última
+        # consulta correcta. Lanza requests.RequestException o ValueError.
+        params = {}
+        if self.updated_since is not None:
+            params["updatedSince"] = iso_timestamp(self.updated_since)
+        response = self.session.get(self.endpoint, params=params, timeout=self.timeout)
+        response.raise_for_status()
+        data = response.json()
+        if not data.get("success"):
+            raise ValueError(data.get("error", "respuesta sin éxito"))
+
+        updated = {
+            canal["_id"]: {
+                "nombre": canal.get("name"),
+                "mensajes_pendientes": canal.get("unread") or 0,
+            }
+            for canal in data.get("update", [])
+        }
+        removed = [canal["_id"] for canal in data.get("remove", [])]
+        # La siguiente consulta parte del cambio más reciente que ha visto el
+        # servidor (su _updatedAt), no del reloj local, que puede ir desfasado
+        for canal in data.get("update", []) + data.get("remove", []):
+            updated_at = parse_timestamp(canal.get("_updatedAt"))
+            if updated_at is not None and (self.updated_since is None or updated_at > self.updated_since):
+                self.updated_since = updated_at
+        return updated, removed
+
+    def close(self):
+        self.session.close()
+
+
+def obtener_mensajes_no_leidos(config=None):
+    # Consulta completa y bloqueante, para usar desde la línea de comandos
+    client = RocketChatClient.from_config(config or load_config())
+    try:
+        updated, _ = client.fetch_changes()
+    finally:
+        client.close()
+    return [canal for canal in updated.values() if canal["mensajes_pendientes"] > 0]
+
+
+if __name__ == "__main__":
+    print(obtener_mensajes_no_leidos())
@@ -0,0 +1,186 @@
+import os
+import json
+import mmap
+import hashlib
+import argparse
+from PyQt5 import sip
+from PyQt5.QtGui import QImage
+
+from sprites import IMAGES_DIR, ANIMATION_FILES, load_image, trim_image
+from petlog import log
+
+# Atlas precalculado: todos los fotogramas ya escalados y recortados, guardados
+# en crudo (ARGB32 premultiplicado) uno debajo de otro, más un índice JSON con
+# sus bandas de píxeles visibles (para las máscaras). Al arrancar se mapea el
+# archivo en memoria y cada fotograma es un QImage que apunta directamente al
+# mapeo: sin decodificar PNG, reescalar ni recorrer píxeles.
+
+ATLAS_DIR = os.path.join(IMAGES_DIR, ".atlas")
+ATLAS_VERSION = 3
+ATLAS_FORMAT = QImage.Format_ARGB32_Premultiplied
+
+# Mapeos abiertos: (ruta, mtime_ns) -> mmap. En Qt (raster) los QPixmap creados
+# desde estos QImage comparten la memoria del mapeo, así que nunca se cierran
+# mientras el proceso viva; se reutilizan si el archivo no cambió.
+_mappings = {}
+
+
+def atlas_paths(size):
+    base = os.path.join(ATLAS_DIR, f"penguin_{size}")
+    return base + ".raw", base + ".json"
+
+
+def file_hash(path):
+    with open(path, "rb") as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+def source_info(name, with_hash=True):
+    path = os.path.join(IMAGES_DIR, name)
+    st = os.stat(path)
+    info = {"mtime_ns": st.st_mtime_ns, "bytes": st.st_size}
+    if with_hash:
+        info["sha1"] = file_hash(path)
+    return info
+
+
+def is_valid(index, size):
+    # El atlas caduca si cambia la escala, la lista de archivos o el contenido
+    # de algún PNG. Se compara primero mtime y tamaño (barato) y solo si
+    # difieren se recurre al hash; si el hash coincide se anota el nuevo mtime.
+    if index.get("version") != ATLAS_VERSION or index.get("size") != size:
+        return False
+    sources = index.get("sources", {})
+    names = [name for names in ANIMATION_FILES.values() for name in names]
+    if sorted(sources) != sorted(names):
+        return False
+    for name in names:
+        try:
+            current = source_info(name, with_hash=False)
+        except OSError:
+            return False
+        recorded = sources[name]
+        if current["mtime_ns"] == recorded["mtime_ns"] and current["bytes"] == recorded["bytes"]:
+            continue
+        if file_hash(os.path.join(IMAGES_DIR, name)) != recorded["sha1"]:
+            return False
+        recorded.update(current)
+    return True
+
+
+def save_atlas(images, size):
+    # images: estado -> lista de (QImage escalado y recortado, x, y, ancho
+    # original, bandas), como trim_image
+    width = max((frame[0].width() for frames in images.values() for frame in frames), default=0)
+    bytes_per_line = width * 4
+    frames_index = {}
+    chunks = []
+    y = 0
+    for state, frames in images.items():
+        rects = []
+        for image, x, y_offset, full_width, bands in frames:
+            image = image.convertToFormat(ATLAS_FORMAT)
+            w, h = image.width(), image.height()
+            # Cada fila se rellena hasta el ancho del atlas
+            bits = image.constBits()
+            bits.setsize(image.bytesPerLine() * h)
+            data = bytes(bits)
+            for row in range(h):
+                start = row * image.bytesPerLine()
+                line = data[start:start + w * 4]
+                chunks.append(line + bytes(bytes_per_line - len(line)))
+            # [y en el atlas, ancho, alto, x/y del recorte, ancho original, bandas]
+            rects.append([y, w, h, x, y_offset, full_width, bands])
+            y += h
+        frames_index[state] = rects
+
+    index = {
+        "version": ATLAS_VERSION,
+        "size": size,
+        "width": width,
+        "height": y,
+        "bytes_per_line": bytes_per_line,
+        "sources": {name: source_info(name) for names in ANIMATION_FILES.values() for name in names},
+        "frames": frames_index,
+    }
+
+    # Escritura atómica: primero los datos y el índice al final, para que un
+    # atlas a medio escribir nunca se considere válido
+    os.makedirs(ATLAS_DIR, exist_ok=True)
+    raw_path, index_path = atlas_paths(size)
+    with open(raw_path + ".tmp", "wb") as f:
+        f.write(b"".join(chunks))
+    os.replace(raw_path + ".tmp", raw_path)
+    write_index(index, index_path)
+    log.debug("Atlas de %dpx guardado en %s (%dx%d)", size, raw_path, width, y)
+
+
+def write_index(index, index_path):
+    with open(index_path + ".tmp", "w") as f:
+        json.dump(index, f)
+    os.replace(index_path + ".tmp", index_path)
+
+
+def build_atlas(size):
+    images = {}
+    for state, names in ANIMATION_FILES.items():
+        frames = []
+        for name in names:
+            image = load_image(os.path.join(IMAGES_DIR, name), size)
+            if image is not None:
+                frames.append(trim_image(image))
+        images[state] = frames
+    save_atlas(images, size)
+
+
+def load_atlas(size):
+    # Devuelve estado -> lista de (QImage, x, y, ancho original, bandas),
+    # como trim_image, o None si no hay atlas válido
+    raw_path, index_path = atlas_paths(size)
+    try:
+        with open(index_path) as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        return None
+    recorded = json.dumps(index["sources"], sort_keys=True) if "sources" in index else None
+    if not is_valid(index, size):
+        log.debug("Atlas de %dpx desactualizado, se reconstruirá", size)
+        return None
+    if json.dumps(index["sources"], sort_keys=True) != recorded:
+        # Solo cambiaron los mtime: evitar volver a calcular hashes
+        try:
+            write_index(index, index_path)
+        except OSError:
+            pass
+
+    bytes_per_line = index["bytes_per_line"]
+    try:
+        key = (raw_path, os.stat(raw_path).st_mtime_ns)
+        mapping = _mappings.get(key)
+        if mapping is None:
+            with open(raw_path, "rb") as f:
+                mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+    if len(mapping) != bytes_per_line * index["height"]:
+        return None
+    _mappings[key] = mapping
+
+    address = int(sip.voidptr(mapping))
+    images = {}
+    for state, rects in index["frames"].items():
+        images[state] = [
+            (QImage(sip.voidptr(address + y * bytes_per_line), w, h, bytes_per_line, ATLAS_FORMAT),
+             x, y_offset, full_width, bands)
+            for y, w, h, x, y_offset, full_width, bands in rects
+        ]
+    return images
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Genera el atlas de sprites precalculado")
+    parser.add_argument("--size", type=int, nargs="+", default=[200],
+                        help="tamaño(s) en píxeles de los fotogramas")
+    args = parser.parse_args()
+    for size in args.size:
+        build_atlas(size)
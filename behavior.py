@@ -0,0 +1,280 @@
+import math
+import time
+import heapq
+import random
+
+from PyQt5.QtCore import QObject, QTimer
+from PyQt5.QtGui import QCursor
+
+from petlog import log
+from engine import KEY_RIGHT, KEY_LEFT, KEY_UP, KEY_DOWN, KEY_A
+
+# Modo autónomo: el pingüino pasea, se desliza hacia el cursor, hace alguna
+# gracia cuando lleva rato sin nada que hacer y se echa la siesta.
+#
+# No añade trabajo al tick. Cada pingüino decide solo cuando toca (al acabar
+# lo que estaba haciendo o tras un tiempo de descanso) o cuando pasa algo
+# (cambio de estado, el usuario lo toca). Las decisiones de todos los
+# pingüinos las ejecuta un único timer compartido, que se detiene en cuanto
+# gasta su presupuesto de CPU y deja el resto para la siguiente vuelta del
+# bucle de eventos.
+
+# Presupuesto por vuelta del director, en segundos
+BUDGET = 0.0005
+# Tras una tecla o un arrastre, el usuario manda durante este tiempo
+USER_GRACE = 30.0
+# Sin usuario y con poca energía, siesta de este tiempo
+NAP_LENGTH = 600.0
+# La energía se gasta al actuar y se recupera entera en este tiempo
+RECOVERY_TIME = 300.0
+# Más cerca del borde que esto, el paseo va hacia el centro
+EDGE_MARGIN = 300
+# El cursor cuenta como lejos a partir de esta distancia
+CHASE_DISTANCE = 400
+
+
+class BehaviorDirector(QObject):
+    # Cola única (por hora de decisión) de todos los planificadores
+
+    _shared = None
+
+    def __init__(self, budget=BUDGET, parent=None):
+        super().__init__(parent)
+        self.budget = budget
+        self.queue = []
+        self.counter = 0
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self.run)
+
+    @classmethod
+    def shared(cls):
+        if cls._shared is None:
+            cls._shared = cls()
+        return cls._shared
+
+    def schedule(self, planner, delay):
+        # Sustituye la decisión pendiente del planificador (si había otra)
+        planner.due = time.monotonic() + max(0.0, delay)
+        self.counter += 1
+        heapq.heappush(self.queue, (planner.due, self.counter, planner))
+        if self.queue[0][2] is planner:
+            self.arm()
+
+    def cancel(self, planner):
+        planner.due = None
+        self.queue = [entry for entry in self.queue if entry[2] is not planner]
+        heapq.heapify(self.queue)
+        self.arm()
+
+    def arm(self):
+        # Las entradas sustituidas o canceladas se descartan al sacarlas
+        while self.queue and self.queue[0][0] != self.queue[0][2].due:
+            heapq.heappop(self.queue)
+        if not self.queue:
+            self.timer.stop()
+            return
+        wait = self.queue[0][0] - time.monotonic()
+        self.timer.start(max(0, math.ceil(wait * 1000)))
+
+    def run(self):
+        started = time.perf_counter()
+        now = time.monotonic()
+        while self.queue and self.queue[0][0] <= now:
+            due, _, planner = heapq.heappop(self.queue)
+            if due != planner.due:
+                continue
+            planner.due = None
+            planner.decide()
+            if time.perf_counter() - started > self.budget:
+                break
+        self.arm()
+
+
+class BehaviorPlanner(QObject):
+    # Planificador por utilidad: en cada decisión puntúa las acciones
+    # posibles con el estado actual y empieza la mejor
+
+    def __init__(self, pet, director=None, rng=None):
+        super().__init__(pet)
+        self.pet = pet
+        self.director = director if director is not None else BehaviorDirector.shared()
+        self.rng = rng if rng is not None else random.Random()
+        self.due = None
+        self.action = None
+        self.held_keys = set()
+        self.energy = 1.0
+        self.energy_at = time.monotonic()
+        self.last_action_at = time.monotonic()
+        self.last_cursor = None
+        self.user_until = 0.0
+        self.actions = [
+            ("rest", self.score_rest, self.start_rest),
+            ("wander", self.score_wander, self.start_wander),
+            ("chase", self.score_chase, self.start_chase),
+            ("fidget", self.score_fidget, self.start_fidget),
+            ("nap", self.score_nap, self.start_nap),
+        ]
+        pet.stateChanged.connect(self.onStateChanged)
+        pet.userActivity.connect(self.onUserActivity)
+        self.director.schedule(self, 1.0)
+
+    def stop(self):
+        self.finish()
+        self.director.cancel(self)
+        self.pet.stateChanged.disconnect(self.onStateChanged)
+        self.pet.userActivity.disconnect(self.onUserActivity)
+
+    # --- eventos ---
+
+    def onUserActivity(self):
+        # El usuario toma el control: se suelta lo que se estuviera haciendo
+        self.finish()
+        self.user_until = time.monotonic() + USER_GRACE
+        self.director.schedule(self, USER_GRACE)
+
+    def onStateChanged(self, state):
+        if self.action == "chase" and state == "slide":
+            self.aim_at_cursor()
+        elif self.action is not None and state == "idle" and not self.held_keys:
+            # La acción terminó sola (p. ej. el salto): decidir pronto
+            self.director.schedule(self, self.rng.uniform(1.0, 3.0))
+
+    # --- decisión ---
+
+    def decide(self):
+        started = time.perf_counter()
+        self.finish()
+        pet = self.pet
+        now = time.monotonic()
+        if now < self.user_until:
+            self.director.schedule(self, self.user_until - now)
+            return
+        if pet.isPaused() or pet.dragging:
+            self.director.schedule(self, 60.0)
+            return
+
+        # Energía: se recupera con el tiempo, calculada solo al decidir
+        self.energy = min(1.0, self.energy + (now - self.energy_at) / RECOVERY_TIME)
+        self.energy_at = now
+        away = now - pet.last_activity
+        context = {
+            # Sin usuario delante, las acciones que gastan CPU pierden interés
+            "away": away >= pet.nap_after,
+            "lively": 0.3 if away >= pet.nap_after else 1.0,
+            "bored": min(1.0, (now - self.last_action_at) / 60.0),
+            "cursor": self.cursor_offset(),
+        }
+        best, best_score = None, 0.0
+        for name, score, start in self.actions:
+            value = score(context) * self.rng.uniform(0.8, 1.2)
+            if value > best_score:
+                best, best_score = (name, start), value
+        name, start = best
+        delay = start(context)
+        if name not in ("rest", "nap"):
+            self.action = name
+            self.last_action_at = now
+        log.debug("Autónomo: %s (%.1fs, energía %.2f)", name, delay, self.energy)
+        self.director.schedule(self, delay)
+        pet.stats.add_call("behavior", time.perf_counter() - started)
+
+    def finish(self):
+        # Soltar las teclas de la acción en curso (el motor vuelve a idle)
+        for key in self.held_keys:
+            self.press(key, False)
+        self.held_keys.clear()
+        self.action = None
+
+    def press(self, key, pressed=True):
+        # Como el teclado, pero sin contar como actividad del usuario (si no,
+        # el pingüino no se dormiría nunca)
+        self.pet.pending_inputs.append((key, pressed))
+        if pressed:
+            self.held_keys.add(key)
+        self.pet.scheduler.wake()
+
+    def spend(self, cost):
+        self.energy = max(0.0, self.energy - cost)
+
+    def cursor_offset(self):
+        # Distancia del centro del pingüino al cursor, o None si no se movió
+        position = QCursor.pos()
+        moved = self.last_cursor is not None and position != self.last_cursor
+        self.last_cursor = position
+        if not moved:
+            return None
+        pet = self.pet.engine.pet
+        return (position.x() - pet.x - self.pet.width() / 2,
+                position.y() - pet.y - self.pet.height() / 2)
+
+    # --- acciones: puntuación y comienzo (devuelve segundos hasta decidir) ---
+
+    def score_rest(self, context):
+        return 0.3 + 0.5 * (1.0 - self.energy)
+
+    def start_rest(self, context):
+        return self.rng.uniform(5.0, 20.0)
+
+    def score_wander(self, context):
+        return self.energy * (0.3 + 0.4 * context["bored"]) * context["lively"]
+
+    def start_wander(self, context):
+        engine = self.pet.engine
+        left, _, right, _ = engine.bounds
+        x = engine.pet.x
+        if x - left < EDGE_MARGIN:
+            key = KEY_RIGHT
+        elif right - (x + engine.width) < EDGE_MARGIN:
+            key = KEY_LEFT
+        else:
+            key = self.rng.choice((KEY_RIGHT, KEY_LEFT))
+        self.press(key)
+        self.spend(0.1)
+        return self.rng.uniform(1.0, 4.0)
+
+    def score_chase(self, context):
+        offset = context["cursor"]
+        if offset is None or math.hypot(*offset) < CHASE_DISTANCE:
+            return 0.0
+        return (0.4 + 0.6 * self.energy) * context["lively"]
+
+    def start_chase(self, context):
+        # pre_slide y después slide; al empezar el slide se apunta al cursor
+        self.press(KEY_DOWN)
+        self.spend(0.3)
+        engine = self.pet.engine
+        speed = engine.table.speed[engine.SLIDE]
+        return 0.5 + min(3.0, math.hypot(*context["cursor"]) / speed)
+
+    def aim_at_cursor(self):
+        engine = self.pet.engine
+        position = QCursor.pos()
+        dx = position.x() - engine.pet.x - engine.width / 2
+        dy = position.y() - engine.pet.y - engine.height / 2
+        distance = math.hypot(dx, dy)
+        if distance:
+            speed = engine.table.speed[engine.SLIDE]
+            engine.set_slide_velocity(dx / distance * speed, dy / distance * speed)
+
+    def score_fidget(self, context):
+        return 0.5 * context["bored"] * (0.5 + 0.5 * self.energy) * context["lively"]
+
+    def start_fidget(self, context):
+        # Saltito o ataque al aire
+        key = self.rng.choice((KEY_UP, KEY_A))
+        self.press(key)
+        self.press(key, False)
+        self.held_keys.discard(key)
+        self.spend(0.05)
+        return self.rng.uniform(2.0, 6.0)
+
+    def score_nap(self, context):
+        # Sin usuario: dormir, sobre todo si está cansado (el planificador
+        # de dibujado se para y esta decisión no vuelve hasta dentro de un rato)
+        if not context["away"]:
+            return 0.0
+        return 0.5 + 2.0 * (1.0 - self.energy)
+
+    def start_nap(self, context):
+        return NAP_LENGTH
@@ -0,0 +1,114 @@
+import argparse
+import os
+import random
+import sys
+import time
+
+# Permite ejecutar el benchmark desde cualquier directorio sin instalar nada
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from engine import PetEngine, KEY_RIGHT, KEY_LEFT, KEY_UP, KEY_DOWN, KEY_A, FACING_NAMES
+
+# Mide el coste por tick del motor sin Qt (no necesita pantalla ni timers).
+# Cada escenario usa una semilla fija, así que el estado final también sirve
+# como comprobación de comportamiento entre commits: si no coincide con el
+# esperado (o no se llega al mínimo de ticks/s pedido), sale con estado 1.
+
+DT = 1.0 / 50
+
+# Estado final esperado (estado, orientación, x, y) por número de ticks.
+# Un cambio intencionado en el motor debe actualizar estos valores
+EXPECTED = {
+    10_000: {
+        "idle": ("idle", "right", 800.0, 600.0),
+        "walk": ("walk", "right", 10800.0, 600.0),
+        "slide": ("slide", "right", 1682.914, 703.571),
+        "mixed": ("jump", "left", 1007.096, 226.937),
+    },
+    1_000_000: {
+        "idle": ("idle", "right", 800.0, 600.0),
+        "walk": ("walk", "right", 1000800.0, 600.0),
+        "slide": ("slide", "left", 288.109, 618.718),
+        "mixed": ("jump", "left", 816.949, 566.348),
+    },
+}
+
+
+def scenario_idle(engine, ticks):
+    step = engine.step
+    for _ in range(ticks):
+        step(DT)
+
+
+def scenario_walk(engine, ticks):
+    engine.step(DT, [(KEY_RIGHT, True)])
+    step = engine.step
+    for _ in range(ticks - 1):
+        step(DT)
+
+
+def scenario_slide(engine, ticks):
+    engine.step(DT, [(KEY_DOWN, True)])
+    step = engine.step
+    for _ in range(ticks - 1):
+        step(DT)
+
+
+def scenario_mixed(engine, ticks):
+    # Secuencia pseudoaleatoria de teclas, como un usuario jugando con el pingüino
+    rng = random.Random(1234)
+    keys = [KEY_RIGHT, KEY_LEFT, KEY_UP, KEY_DOWN, KEY_A]
+    step = engine.step
+    for i in range(ticks):
+        if i % 25 == 0:
+            step(DT, [(rng.choice(keys), rng.random() < 0.6)])
+        else:
+            step(DT)
+
+
+SCENARIOS = {
+    "idle": scenario_idle,
+    "walk": scenario_walk,
+    "slide": scenario_slide,
+    "mixed": scenario_mixed,
+}
+
+
+def run(name, ticks):
+    engine = PetEngine(800, 600, rng=random.Random(42))
+    start = time.perf_counter()
+    SCENARIOS[name](engine, ticks)
+    elapsed = time.perf_counter() - start
+    pet = engine.pet
+    return elapsed, (engine.state_name, FACING_NAMES[pet.facing], round(pet.x, 3), round(pet.y, 3))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del motor del pingüino sin Qt")
+    parser.add_argument("--ticks", type=int, default=1_000_000,
+                        help=f"ticks por escenario (estados esperados para {', '.join(map(str, EXPECTED))})")
+    parser.add_argument("--min-rate", type=float, default=0.0,
+                        help="mínimo de ticks/s por escenario (por defecto sin mínimo)")
+    parser.add_argument("scenarios", nargs="*", default=list(SCENARIOS))
+    args = parser.parse_args()
+
+    expected = EXPECTED.get(args.ticks)
+    if expected is None:
+        print(f"Sin estados esperados para {args.ticks} ticks: no se comprueban")
+    failures = []
+    for name in args.scenarios:
+        elapsed, final = run(name, args.ticks)
+        rate = args.ticks / elapsed
+        print(f"{name:>6}: {rate:12,.0f} ticks/s "
+              f"{elapsed / args.ticks * 1e9:8.1f} ns/tick  final={final}")
+        if expected is not None and final != expected[name]:
+            failures.append(f"{name}: estado final {final}, se esperaba {expected[name]}")
+        if rate < args.min_rate:
+            failures.append(f"{name}: {rate:,.0f} ticks/s, por debajo de {args.min_rate:,.0f}")
+    for failure in failures:
+        print(failure)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
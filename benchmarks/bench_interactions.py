@@ -0,0 +1,96 @@
+import argparse
+import os
+import random
+import sys
+import time
+
+# Permite ejecutar el benchmark desde cualquier directorio sin instalar nada
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from engine import PetEngine
+from interactions import InteractionWorld, BUDGET
+
+# Mide InteractionWorld.resolve() con muchos pingüinos en una pantalla 1080p.
+# La física de cada pingüino avanza fuera de la medición: solo cuenta la
+# pasada de colisiones que el planificador hace una vez por tick (incluida la
+# reclasificación de los que cambiaron de estado en ese paso).
+#
+# Cada escenario se mide dos veces: con la pasada completa (sin presupuesto,
+# determinista para una semilla) y con el presupuesto del planificador, que
+# cumple el tiempo dejando activos sin mirar: se cuentan aparte.
+
+DT = 1.0 / 50
+BOUNDS = (0, 0, 1920, 1080)
+
+# Fracción de pingüinos en cada estado al empezar
+SCENARIOS = {
+    "idle": {},
+    "mixed": {"walk": 0.05, "slide": 0.05, "atack": 0.02},
+    "slide": {"slide": 1.0},
+}
+
+
+def make_pets(count, mix, rng):
+    engines = []
+    for _ in range(count):
+        engine = PetEngine(rng.uniform(0, 1720), rng.uniform(0, 880), bounds=BOUNDS,
+                           rng=random.Random(rng.random()))
+        roll = rng.random()
+        for state, fraction in mix.items():
+            if roll < fraction:
+                engine.set_state(state)
+                engine.pet.facing = rng.choice((1, -1))
+                break
+            roll -= fraction
+        engines.append(engine)
+    return engines
+
+
+def run(name, count, ticks, seed, budget=None):
+    rng = random.Random(seed)
+    engines = make_pets(count, SCENARIOS[name], rng)
+    world = InteractionWorld(budget=budget)
+    for engine in engines:
+        world.add(engine)
+    times = []
+    contacts = 0
+    skipped = 0
+    movers = 0
+    for tick in range(ticks):
+        for engine in engines:
+            engine.step(DT)
+            # Los ataques terminan: se repiten de vez en cuando
+            if engine.pet.state == engine.IDLE and SCENARIOS[name].get("atack") and rng.random() < 0.001:
+                engine.set_state(engine.ATACK)
+        started = time.perf_counter()
+        contacts += world.resolve()
+        times.append(time.perf_counter() - started)
+        skipped += world.skipped
+        movers += len(world.movers)
+    times.sort()
+    return (sum(times) / len(times), times[int(len(times) * 0.99)], times[-1], contacts,
+            skipped / movers if movers else 0.0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de colisiones entre pingüinos")
+    parser.add_argument("--pets", type=int, default=300)
+    parser.add_argument("--ticks", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--budget", type=float, default=BUDGET * 1000,
+                        help="presupuesto por pasada en ms para la segunda medida (0 = solo la completa)")
+    parser.add_argument("scenarios", nargs="*", default=list(SCENARIOS))
+    args = parser.parse_args()
+
+    budgets = [None] + ([args.budget / 1000] if args.budget > 0 else [])
+    for name in args.scenarios:
+        for budget in budgets:
+            mean, p99, worst, contacts, skipped = run(name, args.pets, args.ticks, args.seed, budget)
+            label = "completa" if budget is None else f"tope {budget * 1000:g}ms"
+            print(f"{name:>6} {label:>11}: {args.pets} pingüinos  media {mean * 1000:6.3f}ms  "
+                  f"p99 {p99 * 1000:6.3f}ms  peor {worst * 1000:6.3f}ms  contactos={contacts}  "
+                  f"activos sin mirar {skipped:6.1%}")
+
+
+if __name__ == "__main__":
+    main()
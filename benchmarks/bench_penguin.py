@@ -0,0 +1,265 @@
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import statistics
+import subprocess
+
+# Benchmarks del pingüino con Qt sin pantalla (QT_QPA_PLATFORM=offscreen):
+# importación y arranque, carga de sprites, updateAnimation por estado,
+# setState por orientación y arrastre con el ratón. Los resultados se pueden
+# guardar en JSON y comparar con los de otro commit.
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+STATES = ("idle", "walk", "jump", "atack", "pre_slide", "slide")
+
+
+def summarize(samples):
+    # Tiempos en segundos -> estadísticas en microsegundos
+    samples = sorted(samples)
+    return {
+        "median_us": statistics.median(samples) * 1e6,
+        "mean_us": statistics.fmean(samples) * 1e6,
+        "p95_us": samples[min(len(samples) - 1, int(0.95 * len(samples)))] * 1e6,
+        "n": len(samples),
+    }
+
+
+def run_python(code, runs):
+    # Ejecuta `code` en procesos nuevos (arranque en frío de Python) y devuelve
+    # el tiempo de pared y el último valor que imprima el proceso
+    samples = []
+    output = None
+    for _ in range(runs):
+        started = time.perf_counter()
+        result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True,
+                                text=True, check=True)
+        samples.append(time.perf_counter() - started)
+        output = result.stdout.strip().splitlines()[-1] if result.stdout.strip() else None
+    return samples, output
+
+
+STARTUP_CODE = """
+import sys, time
+started = time.perf_counter()
+from PyQt5.QtWidgets import QApplication
+app = QApplication(sys.argv)
+from penguin import PenguinCharacter
+pet = PenguinCharacter()
+pet.show()
+# Entrada antes de que terminen de cargarse las animaciones (arranque en frío):
+# el pingüino debe seguir mostrando idle hasta que lleguen, sin fallar
+from PyQt5.QtCore import Qt, QEvent
+from PyQt5.QtGui import QKeyEvent
+pet.keyPressEvent(QKeyEvent(QEvent.KeyPress, Qt.Key_Right, Qt.NoModifier))
+pet.updateAnimation(1, 0.0)
+pet.keyReleaseEvent(QKeyEvent(QEvent.KeyRelease, Qt.Key_Right, Qt.NoModifier))
+while pet.first_frame_ms is None:
+    app.processEvents()
+print((time.perf_counter() - started) * 1000)
+# Sin atlas quedan fotogramas decodificándose: esperarlos antes de salir
+import sprites
+sprites.drain_pool()
+"""
+
+
+def bench_startup(runs, atlas_dir):
+    results = {}
+    samples, _ = run_python("import penguin", runs)
+    results["import_penguin"] = summarize(samples)
+
+    # Arranque en frío (sin atlas) y en caliente (atlas ya generado)
+    for label, warm in (("startup_png", False), ("startup_atlas", True)):
+        first_frame = []
+        process = []
+        for _ in range(runs):
+            shutil.rmtree(atlas_dir, ignore_errors=True)
+            if warm:
+                subprocess.run([sys.executable, "atlas.py"], cwd=ROOT, capture_output=True, check=True)
+            samples, output = run_python(STARTUP_CODE, 1)
+            process.extend(samples)
+            first_frame.append(float(output) / 1000)
+        results[label + "_first_frame"] = summarize(first_frame)
+        results[label + "_process"] = summarize(process)
+    return results
+
+
+def bench_load(runs, atlas_dir):
+    import atlas
+    import sprites
+    results = {}
+    for label, warm in (("load_animations_png", False), ("load_animations_atlas", True)):
+        samples = []
+        for _ in range(runs):
+            shutil.rmtree(atlas_dir, ignore_errors=True)
+            if warm:
+                atlas.build_atlas(200)
+            started = time.perf_counter()
+            sprite_set = sprites.acquire(200)
+            sprite_set.waitUntilLoaded()
+            samples.append(time.perf_counter() - started)
+            sprites.release(sprite_set)
+            sprites.pool().waitForDone()  # no solapar la escritura del atlas
+        results[label] = summarize(samples)
+    return results
+
+
+def make_pet():
+    from penguin import PenguinCharacter
+    pet = PenguinCharacter(position=(300, 200))
+    # El benchmark llama a updateAnimation a mano: sin timer de fondo
+    pet.scheduler.timer.stop()
+    pet.show()
+    pet.sprites.waitUntilLoaded()
+    return pet
+
+
+def bench_update(pet, calls):
+    results = {}
+    for state in STATES:
+        pet.setState(state)
+        samples = []
+        for _ in range(calls):
+            started = time.perf_counter()
+            pet.updateAnimation(1, 0.5)
+            samples.append(time.perf_counter() - started)
+            # Los estados de un solo uso (pre_slide pasa a slide) terminan:
+            # reiniciarlos fuera de la medida
+            if pet.engine.state_name != state:
+                pet.setState(state)
+        results[f"update_{state}"] = summarize(samples)
+    pet.setState("idle")
+    return results
+
+
+def bench_set_state(pet, calls):
+    results = {}
+    from engine import RIGHT, LEFT, FACING_NAMES
+    for facing in (RIGHT, LEFT):
+        samples = []
+        for i in range(calls):
+            pet.engine.pet.facing = facing
+            state = STATES[i % len(STATES)]
+            started = time.perf_counter()
+            pet.setState(state)
+            samples.append(time.perf_counter() - started)
+        results[f"set_state_{FACING_NAMES[facing]}"] = summarize(samples)
+    pet.setState("idle")
+    return results
+
+
+def bench_drag(pet, events):
+    from PyQt5.QtCore import Qt, QEvent, QPoint, QPointF
+    from PyQt5.QtGui import QMouseEvent
+    from PyQt5.QtWidgets import QApplication
+
+    def mouse(kind, x, y, button, buttons):
+        local = QPointF(x - pet.x(), y - pet.y())
+        return QMouseEvent(kind, local, QPointF(x, y), button, buttons, Qt.NoModifier)
+
+    origin = pet.pos() + QPoint(100, 100)
+    pet.mousePressEvent(mouse(QEvent.MouseButtonPress, origin.x(), origin.y(),
+                              Qt.LeftButton, Qt.LeftButton))
+    started = time.perf_counter()
+    for i in range(events):
+        # Trayectoria en zigzag, como un ratón con alta frecuencia de sondeo
+        x = origin.x() + (i % 200)
+        y = origin.y() + (i % 50)
+        pet.mouseMoveEvent(mouse(QEvent.MouseMove, x, y, Qt.NoButton, Qt.LeftButton))
+    # Incluye lo que quede pendiente de aplicar en el siguiente tick
+    pet.updateAnimation(1, 0.0)
+    QApplication.processEvents()
+    elapsed = time.perf_counter() - started
+    pet.mouseReleaseEvent(mouse(QEvent.MouseButtonRelease, origin.x(), origin.y(),
+                                Qt.LeftButton, Qt.NoButton))
+    return {"drag_stream": {"events_per_s": events / elapsed,
+                            "per_event_us": elapsed / events * 1e6, "n": events}}
+
+
+def git_revision():
+    try:
+        result = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                                capture_output=True, text=True, check=True)
+        return result.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline):
+    # Imprime la relación actual/base de la métrica principal de cada prueba
+    print(f"\n{'prueba':<34}{'base':>12}{'actual':>12}{'cambio':>10}")
+    for name, current in results.items():
+        if name not in baseline:
+            continue
+        key = "events_per_s" if "events_per_s" in current else "median_us"
+        before, after = baseline[name][key], current[key]
+        if not before:
+            continue
+        change = (after / before - 1) * 100
+        # Para el rendimiento de eventos, más es mejor; para tiempos, menos
+        if key == "events_per_s":
+            change = -change
+        print(f"{name:<34}{before:>12.1f}{after:>12.1f}{change:>+9.1f}%")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks del pingüino sin pantalla")
+    parser.add_argument("--runs", type=int, default=5, help="repeticiones de arranque y carga")
+    parser.add_argument("--calls", type=int, default=2000, help="llamadas por prueba de tick")
+    parser.add_argument("--drag-events", type=int, default=20000)
+    parser.add_argument("--skip-startup", action="store_true",
+                        help="omitir las pruebas que lanzan procesos nuevos")
+    parser.add_argument("--output", help="guardar los resultados en este JSON")
+    parser.add_argument("--compare", help="JSON de otro commit con el que comparar")
+    args = parser.parse_args()
+
+    from PyQt5.QtWidgets import QApplication
+    app = QApplication(sys.argv[:1])
+    import atlas
+
+    # El atlas de la copia de trabajo se aparta para poder medir con y sin él
+    atlas_backup = tempfile.mkdtemp(prefix="penguin-atlas-")
+    had_atlas = os.path.isdir(atlas.ATLAS_DIR)
+    if had_atlas:
+        shutil.copytree(atlas.ATLAS_DIR, atlas_backup, dirs_exist_ok=True)
+    results = {}
+    try:
+        if not args.skip_startup:
+            results.update(bench_startup(args.runs, atlas.ATLAS_DIR))
+        results.update(bench_load(args.runs, atlas.ATLAS_DIR))
+        pet = make_pet()
+        results.update(bench_update(pet, args.calls))
+        results.update(bench_set_state(pet, args.calls))
+        results.update(bench_drag(pet, args.drag_events))
+    finally:
+        shutil.rmtree(atlas.ATLAS_DIR, ignore_errors=True)
+        if had_atlas:
+            shutil.copytree(atlas_backup, atlas.ATLAS_DIR)
+        shutil.rmtree(atlas_backup, ignore_errors=True)
+
+    for name, value in results.items():
+        if "events_per_s" in value:
+            print(f"{name:<34}{value['events_per_s']:>12,.0f} eventos/s "
+                  f"({value['per_event_us']:.2f} us/evento)")
+        else:
+            print(f"{name:<34}{value['median_us']:>12.1f} us mediana  "
+                  f"p95 {value['p95_us']:.1f} us  (n={value['n']})")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"revision": git_revision(), "python": sys.version.split()[0],
+                       "results": results}, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            compare(results, json.load(f)["results"])
+    app.quit()
+
+
+if __name__ == "__main__":
+    main()
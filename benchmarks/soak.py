@@ -0,0 +1,230 @@
+import os
+import sys
+import time
+import random
+import argparse
+import tracemalloc
+
+# Prueba de resistencia sin pantalla: simula días de uso (teclas, arrastres,
+# menú contextual, superposición, ocultar/mostrar, avisos) en unos minutos,
+# avanzando la física en lotes sin esperar al reloj. Cada hora simulada se
+# toma una muestra de recursos (ver resources.py) y al final se falla si algo
+# sigue creciendo tras el calentamiento.
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+PHYSICS_HZ = 50
+
+# Crecimiento permitido entre el final del calentamiento y el final
+TOLERANCES = {
+    "windows": 0,
+    "qobjects": 0,
+    "pixmaps": 0,
+    "pixmap_bytes": 0,
+    "gc_objects": 0.02,  # fracción
+    "python_heap_bytes": 0.05,
+    "rss_bytes": 0.15,
+}
+
+
+class Simulator:
+    def __init__(self, pets, rng):
+        from PyQt5.QtCore import Qt
+        self.pets = pets
+        self.rng = rng
+        self.keys = [Qt.Key_Right, Qt.Key_Left, Qt.Key_Up, Qt.Key_Down, Qt.Key_A]
+        self.held_keys = {}
+        self.actions = [
+            (30, self.tap_key),
+            (20, self.hold_or_release_key),
+            (10, self.drag),
+            (5, self.set_state),
+            (3, self.notify),
+            (2, self.context_menu),
+            (1, self.toggle_overlay),
+            (1, self.hide_and_show),
+        ]
+        self.weights = [weight for weight, _ in self.actions]
+
+    def random_event(self):
+        pet = self.rng.choice(self.pets)
+        action = self.rng.choices(self.actions, self.weights)[0][1]
+        action(pet)
+
+    def key(self, pet, key, pressed):
+        from PyQt5.QtCore import Qt, QEvent
+        from PyQt5.QtGui import QKeyEvent
+        kind = QEvent.KeyPress if pressed else QEvent.KeyRelease
+        event = QKeyEvent(kind, key, Qt.NoModifier)
+        (pet.keyPressEvent if pressed else pet.keyReleaseEvent)(event)
+
+    def tap_key(self, pet):
+        key = self.rng.choice(self.keys)
+        self.key(pet, key, True)
+        self.key(pet, key, False)
+
+    def hold_or_release_key(self, pet):
+        held = self.held_keys.setdefault(pet, set())
+        if held and self.rng.random() < 0.5:
+            key = held.pop()
+            self.key(pet, key, False)
+        else:
+            key = self.rng.choice(self.keys)
+            held.add(key)
+            self.key(pet, key, True)
+
+    def drag(self, pet):
+        from PyQt5.QtCore import Qt, QEvent, QPointF
+        from PyQt5.QtGui import QMouseEvent
+
+        def mouse(kind, x, y, button, buttons):
+            return QMouseEvent(kind, QPointF(x - pet.x(), y - pet.y()), QPointF(x, y),
+                               button, buttons, Qt.NoModifier)
+
+        x, y = pet.x() + 100, pet.y() + 100
+        pet.mousePressEvent(mouse(QEvent.MouseButtonPress, x, y, Qt.LeftButton, Qt.LeftButton))
+        for _ in range(self.rng.randint(1, 30)):
+            x += self.rng.randint(-20, 20)
+            y += self.rng.randint(-20, 20)
+            pet.mouseMoveEvent(mouse(QEvent.MouseMove, x, y, Qt.NoButton, Qt.LeftButton))
+        pet.mouseReleaseEvent(mouse(QEvent.MouseButtonRelease, x, y, Qt.LeftButton, Qt.NoButton))
+
+    def set_state(self, pet):
+        pet.setState(self.rng.choice(pet.engine.table.names))
+
+    def notify(self, pet):
+        pet.onUnreadChanged(self.rng.randint(0, 5), [{"nombre": "general", "mensajes_pendientes": 1}])
+        pet.onNewMessages(1)
+
+    def context_menu(self, pet):
+        # El menú es modal: se cierra en cuanto el bucle de eventos lo muestra
+        from PyQt5.QtCore import QPoint, QTimer
+        from PyQt5.QtGui import QContextMenuEvent
+        from PyQt5.QtWidgets import QApplication
+
+        def close_popup():
+            popup = QApplication.activePopupWidget()
+            if popup is not None:
+                popup.close()
+
+        QTimer.singleShot(0, close_popup)
+        pet.contextMenuEvent(QContextMenuEvent(QContextMenuEvent.Mouse, QPoint(10, 10),
+                                               pet.mapToGlobal(QPoint(10, 10))))
+
+    def toggle_overlay(self, pet):
+        pet.toggleOverlay()
+
+    def hide_and_show(self, pet):
+        pet.hide()
+        pet.show()
+
+
+def quiet_offscreen(kind, context, message):
+    # El plugin offscreen avisa de cada cosa que no soporta (capturar el
+    # teclado para el menú, raise()...); el resto de mensajes se muestran
+    if "does not support" not in message:
+        print(message, file=sys.stderr)
+
+
+def run(hours, pets_count, batch, seed, event_every):
+    from PyQt5.QtCore import qInstallMessageHandler
+    from PyQt5.QtWidgets import QApplication
+    qInstallMessageHandler(quiet_offscreen)
+    app = QApplication(sys.argv[:1])
+    import resources
+    from penguin import PenguinCharacter
+
+    pets = [PenguinCharacter(position=(200 + 150 * i, 300)) for i in range(pets_count)]
+    scheduler = pets[0].scheduler
+    # La física la avanza este bucle, no el reloj real
+    scheduler.timer.timeout.disconnect(scheduler.tick)
+    for pet in pets:
+        pet.show()
+        pet.sprites.waitUntilLoaded()
+    sim = Simulator(pets, random.Random(seed))
+
+    steps_per_hour = 3600 * PHYSICS_HZ
+    samples = []
+    started = time.perf_counter()
+    step = 0
+    calls = 0
+    for hour in range(1, hours + 1):
+        while step < hour * steps_per_hour:
+            for pet in pets:
+                pet.updateAnimation(batch, 0.0)
+            step += batch
+            calls += 1
+            if calls % event_every == 0:
+                sim.random_event()
+            if calls % 20 == 0:
+                app.processEvents()
+        app.processEvents()
+        sample = resources.snapshot(full=True)
+        sample["hour"] = hour
+        samples.append(sample)
+        print(format_sample(sample), flush=True)
+
+    elapsed = time.perf_counter() - started
+    print(f"\n{hours} h simuladas ({step} pasos por pingüino) en {elapsed:.1f} s")
+    for pet in pets:
+        pet.close()
+    app.processEvents()
+    return samples
+
+
+def format_sample(s):
+    heap = s.get("python_heap_bytes")
+    heap_text = f"{heap / 2**20:8.2f}" if heap is not None else f"{'-':>8}"
+    rss = s["rss_bytes"]
+    rss_text = f"{rss / 2**20:7.1f}" if rss is not None else f"{'-':>7}"
+    return (f"h{s['hour']:<5}{s['windows']:>8}{s['qobjects']:>9}{s['pixmaps']:>8}"
+            f"{s['pixmap_bytes'] / 2**20:>9.2f}{rss_text}{s['gc_objects']:>10}{heap_text}")
+
+
+def check_growth(samples, warmup):
+    # Compara la primera muestra tras el calentamiento con la última
+    base = samples[min(warmup, len(samples) - 1)]
+    final = samples[-1]
+    failures = []
+    for key, tolerance in TOLERANCES.items():
+        before, after = base.get(key), final.get(key)
+        if before is None or after is None:
+            continue
+        allowed = before * tolerance if isinstance(tolerance, float) else tolerance
+        if after - before > allowed:
+            failures.append(f"{key}: {before} -> {after} (permitido +{allowed:.0f})")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prueba de resistencia sin pantalla")
+    parser.add_argument("--hours", type=int, default=24, help="horas simuladas")
+    parser.add_argument("--pets", type=int, default=2)
+    parser.add_argument("--batch", type=int, default=10,
+                        help="pasos de física por llamada a updateAnimation")
+    parser.add_argument("--event-every", type=int, default=5,
+                        help="llamadas a updateAnimation entre eventos simulados")
+    parser.add_argument("--warmup", type=int, default=2, help="horas de calentamiento")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--tracemalloc", action="store_true",
+                        help="medir también el heap de Python (más lento)")
+    args = parser.parse_args()
+
+    if args.tracemalloc:
+        tracemalloc.start()
+    print(f"{'hora':<6}{'ventanas':>8}{'qobjects':>9}{'pixmaps':>8}{'pix MB':>9}"
+          f"{'rss MB':>7}{'gc objs':>10}{'heap MB':>8}")
+    samples = run(args.hours, args.pets, args.batch, args.seed, args.event_every)
+    failures = check_growth(samples, args.warmup)
+    for failure in failures:
+        print("CRECE", failure)
+    if failures:
+        return 1
+    print("Sin crecimiento tras el calentamiento")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,61 @@
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+import subprocess
+
+# Comprobación del presupuesto de arranque: lanza main.py en procesos nuevos
+# (arranque en frío de Python y Qt) con cada perfil y mide el tiempo de pared
+# hasta que el primer pingüino está dibujado. Falla (estado 1) si la mediana
+# de algún perfil supera el presupuesto.
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from main import PROFILES
+
+
+def measure(profile):
+    started = time.perf_counter()
+    process = subprocess.Popen([sys.executable, "main.py", "--profile", profile, "--startup-report"],
+                               cwd=ROOT, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+    line = process.stdout.readline()
+    wall_ms = (time.perf_counter() - started) * 1000
+    process.wait()
+    if not line:
+        raise RuntimeError(f"main.py --profile {profile} terminó sin informe de arranque")
+    report = json.loads(line)
+    report["wall_ms"] = wall_ms
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Presupuesto de arranque por perfil")
+    parser.add_argument("--budget", type=float, default=500.0,
+                        help="milisegundos hasta el primer fotograma (mediana, por defecto 500)")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("profiles", nargs="*", default=sorted(PROFILES))
+    args = parser.parse_args()
+
+    over = []
+    print(f"{'perfil':<11}{'pared ms':>10}{'imports ms':>12}{'fotograma ms':>14}{'módulos':>9}")
+    for profile in args.profiles:
+        reports = [measure(profile) for _ in range(args.runs)]
+        wall = statistics.median(r["wall_ms"] for r in reports)
+        imports = statistics.median(r["imports_ms"] for r in reports)
+        first_frame = statistics.median(r["first_frame_ms"] for r in reports)
+        print(f"{profile:<11}{wall:>10.1f}{imports:>12.1f}{first_frame:>14.1f}{reports[-1]['modules']:>9}")
+        if wall > args.budget:
+            over.append(profile)
+    if over:
+        print(f"Por encima del presupuesto de {args.budget:.0f}ms: {', '.join(over)}")
+        return 1
+    print(f"Todos los perfiles arrancan dentro de {args.budget:.0f}ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
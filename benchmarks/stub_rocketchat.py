@@ -0,0 +1,72 @@
+import os
+import sys
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from urllib.parse import urlparse, parse_qs
+
+# Permite ejecutar la comprobación desde cualquier directorio sin instalar nada
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from api_rocketchat import RocketChatClient
+from notifier import RocketChatNotifier
+
+# Comprobación del notificador contra un servidor HTTP falso: el primer
+# sondeo (sin updatedSince) es la referencia y no avisa, y el siguiente pide
+# los cambios desde el _updatedAt más reciente de la respuesta, no desde el
+# reloj local. Falla (estado 1) si algo no se cumple.
+
+RESPONSES = [
+    {"success": True, "remove": [], "update": [
+        {"_id": "a", "name": "general", "unread": 3, "_updatedAt": "2017-11-25T15:08:17.248Z"},
+        {"_id": "b", "name": "random", "unread": 0, "_updatedAt": "2017-11-26T09:00:00.500Z"},
+    ]},
+    {"success": True, "remove": [], "update": [
+        {"_id": "a", "name": "general", "unread": 5, "_updatedAt": "2017-11-27T10:00:00.000Z"},
+    ]},
+]
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    queries = []
+
+    def do_GET(self):
+        self.queries.append(parse_qs(urlparse(self.path).query))
+        body = json.dumps(RESPONSES[min(len(self.queries), len(RESPONSES)) - 1]).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def main():
+    server = HTTPServer(("127.0.0.1", 0), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    client = RocketChatClient(f"http://127.0.0.1:{server.server_port}", "token", "user")
+    notifier = RocketChatNotifier(client)
+    alerts = []
+    notifier.newMessages.connect(alerts.append)
+    try:
+        for _ in RESPONSES:
+            notifier.apply(*client.fetch_changes())
+    finally:
+        client.close()
+        server.shutdown()
+
+    checks = {
+        "primer sondeo sin updatedSince": "updatedSince" not in StubHandler.queries[0],
+        "updatedSince del servidor": StubHandler.queries[1].get("updatedSince") == ["2017-11-26T09:00:00.500Z"],
+        "solo avisa de los nuevos": alerts == [2],
+        "pendientes al día": sum(canal["mensajes_pendientes"] for canal in notifier.unread.values()) == 5,
+    }
+    for name, ok in checks.items():
+        print(f"{'ok' if ok else 'FALLO'}: {name}")
+    return 0 if all(checks.values()) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,304 @@
+import sys
+import json
+import math
+import argparse
+
+from PyQt5.QtCore import QObject, QTimer
+from PyQt5.QtNetwork import QLocalServer, QLocalSocket
+
+from petlog import log
+from engine import KEY_RIGHT, KEY_LEFT, KEY_UP, KEY_DOWN, KEY_A, FACING_NAMES
+
+# API de control local: JSON-RPC 2.0 sobre un socket local (Unix o tubería con
+# nombre en Windows), un mensaje por línea. Cada línea puede ser una petición
+# o un lote (lista) de peticiones. Los comandos no se aplican al llegar: los
+# que llegan dentro de un intervalo de fotograma se encolan y se aplican todos
+# juntos al vencer ese intervalo (flush_timer, no el tick del planificador), y
+# las respuestas salen entonces. No hace falta que ningún pingüino tenga el foco.
+#
+# Métodos: list, spawn {x, y}, close {pet}, set_state {pet, state},
+# move {pet, x, y}, key {pet, key, pressed}, query {pet},
+# subscribe {events: ["state", "spawn", "close"]}
+# Los eventos suscritos llegan como notificaciones con method "event".
+
+SERVER_NAME = "penguin-control"
+
+KEY_CODES = {
+    "right": KEY_RIGHT,
+    "left": KEY_LEFT,
+    "up": KEY_UP,
+    "down": KEY_DOWN,
+    "a": KEY_A,
+}
+EVENTS = ("state", "spawn", "close")
+
+# Códigos de error de JSON-RPC
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+INTERNAL_ERROR = -32603
+PET_ERROR = -32000
+
+# Mayor coordenada que acepta una ventana de Qt (QWIDGETSIZE_MAX)
+COORD_LIMIT = (1 << 24) - 1
+
+
+class RpcError(Exception):
+    def __init__(self, code, message):
+        super().__init__(message)
+        self.code = code
+
+
+class ControlClient:
+    __slots__ = ("socket", "buffer", "events", "closed")
+
+    def __init__(self, socket):
+        self.socket = socket
+        self.buffer = b""
+        self.events = set()
+        # Tras desconectarse el socket se destruye: no se vuelve a tocar
+        self.closed = False
+
+
+class ControlServer(QObject):
+    def __init__(self, scheduler, spawn, name=SERVER_NAME, parent=None):
+        super().__init__(parent)
+        self.scheduler = scheduler
+        self.spawn_pet = spawn  # (x, y) -> PenguinCharacter ya visible
+        self.pets = {}
+        self.next_id = 0
+        self.clients = {}
+        # (cliente, petición, lote o None) en orden de llegada
+        self.queue = []
+        # Los comandos que llegan durante un intervalo de fotograma se aplican juntos
+        self.flush_timer = QTimer(self)
+        self.flush_timer.setSingleShot(True)
+        self.flush_timer.timeout.connect(self.flush)
+
+        self.server = QLocalServer(self)
+        self.server.setSocketOptions(QLocalServer.UserAccessOption)
+        self.server.newConnection.connect(self.onNewConnection)
+        QLocalServer.removeServer(name)  # socket huérfano de una ejecución anterior
+        if not self.server.listen(name):
+            log.warning("No se pudo abrir el control local '%s': %s", name, self.server.errorString())
+        else:
+            log.info("Control local en %s", self.server.fullServerName())
+
+    def add_pet(self, pet):
+        pet_id = self.next_id
+        self.next_id += 1
+        self.pets[pet_id] = pet
+        pet.stateChanged.connect(lambda state, pet_id=pet_id: self.emit_event(
+            "state", {"pet": pet_id, "state": state}))
+        pet.closed.connect(lambda pet_id=pet_id: self.onPetClosed(pet_id))
+        return pet_id
+
+    def onPetClosed(self, pet_id):
+        if self.pets.pop(pet_id, None) is not None:
+            self.emit_event("close", {"pet": pet_id})
+
+    # --- conexión ---
+
+    def onNewConnection(self):
+        while self.server.hasPendingConnections():
+            socket = self.server.nextPendingConnection()
+            client = ControlClient(socket)
+            self.clients[socket] = client
+            socket.readyRead.connect(lambda client=client: self.onReadyRead(client))
+            socket.disconnected.connect(lambda socket=socket: self.onDisconnected(socket))
+
+    def onDisconnected(self, socket):
+        client = self.clients.pop(socket, None)
+        if client is not None:
+            client.closed = True
+            client.socket = None
+        # Lo que dejó en cola ya no tiene a quién responder
+        self.queue = [entry for entry in self.queue if entry[0] is not client]
+        socket.deleteLater()
+
+    def onReadyRead(self, client):
+        client.buffer += bytes(client.socket.readAll())
+        *lines, client.buffer = client.buffer.split(b"\n")
+        for line in lines:
+            if line.strip():
+                self.enqueue(client, line)
+        if self.queue and not self.flush_timer.isActive():
+            self.flush_timer.start(self.scheduler.interval_ms)
+
+    def enqueue(self, client, line):
+        try:
+            message = json.loads(line)
+        except ValueError:
+            self.send(client, error_response(None, PARSE_ERROR, "JSON inválido"))
+            return
+        if isinstance(message, list):
+            if not message:
+                self.send(client, error_response(None, INVALID_REQUEST, "lote vacío"))
+                return
+            # Las respuestas de un lote se devuelven juntas, en una línea
+            batch = {"pending": len(message), "responses": []}
+            for request in message:
+                self.queue.append((client, request, batch))
+        else:
+            self.queue.append((client, message, None))
+
+    def send(self, client, payload):
+        if client.closed:
+            return
+        if client.socket.state() == QLocalSocket.ConnectedState:
+            client.socket.write(json.dumps(payload).encode("utf-8") + b"\n")
+
+    def emit_event(self, event, params):
+        message = None
+        for client in self.clients.values():
+            if event in client.events:
+                if message is None:
+                    message = {"jsonrpc": "2.0", "method": "event",
+                               "params": dict(params, event=event)}
+                self.send(client, message)
+
+    # --- aplicación por intervalo de fotograma ---
+
+    def flush(self):
+        queue, self.queue = self.queue, []
+        for client, request, batch in queue:
+            response = self.execute(client, request)
+            if batch is None:
+                if response is not None:
+                    self.send(client, response)
+                continue
+            if response is not None:
+                batch["responses"].append(response)
+            batch["pending"] -= 1
+            if batch["pending"] == 0 and batch["responses"]:
+                self.send(client, batch["responses"])
+        self.scheduler.wake()
+
+    def execute(self, client, request):
+        if not isinstance(request, dict) or not isinstance(request.get("method"), str):
+            return error_response(None, INVALID_REQUEST, "petición inválida")
+        request_id = request.get("id")
+        handler = getattr(self, "rpc_" + request["method"], None)
+        if handler is None:
+            result = error_response(request_id, METHOD_NOT_FOUND, f"método desconocido: {request['method']}")
+        else:
+            params = request.get("params") or {}
+            try:
+                if not isinstance(params, dict):
+                    raise RpcError(INVALID_PARAMS, "params debe ser un objeto")
+                result = {"jsonrpc": "2.0", "id": request_id, "result": handler(client, **params)}
+            except (TypeError, ValueError) as e:
+                result = error_response(request_id, INVALID_PARAMS, str(e))
+            except RpcError as e:
+                result = error_response(request_id, e.code, str(e))
+            except Exception as e:
+                # Una petición rota no tumba el proceso ni el resto del lote
+                log.exception("Fallo al ejecutar %s", request["method"])
+                result = error_response(request_id, INTERNAL_ERROR, f"error interno: {e}")
+        # Sin id es una notificación: no se responde
+        return result if "id" in request else None
+
+    def pet(self, pet_id):
+        try:
+            return self.pets[pet_id]
+        except (KeyError, TypeError):
+            raise RpcError(PET_ERROR, f"no existe el pingüino {pet_id}") from None
+
+    # --- métodos ---
+
+    def rpc_list(self, client):
+        return sorted(self.pets)
+
+    def rpc_spawn(self, client, x=None, y=None):
+        if x is None or y is None:
+            x, y = 1600 - 150 * (len(self.pets) % 10), 800 - 150 * (len(self.pets) // 10)
+        else:
+            x, y = coordinate(x), coordinate(y)
+        pet_id = self.add_pet(self.spawn_pet(x, y))
+        self.emit_event("spawn", {"pet": pet_id})
+        return pet_id
+
+    def rpc_close(self, client, pet):
+        self.pet(pet).close()
+        return True
+
+    def rpc_set_state(self, client, pet, state):
+        target = self.pet(pet)
+        if state not in target.engine.table.ids:
+            raise RpcError(INVALID_PARAMS, f"estado desconocido: {state}")
+        target.setState(state)
+        return True
+
+    def rpc_move(self, client, pet, x, y):
+        target = self.pet(pet)
+        # Validar antes de tocar el motor, para no dejarle una posición rota
+        target.moveTo(coordinate(x), coordinate(y))
+        return True
+
+    def rpc_key(self, client, pet, key, pressed=True):
+        if key not in KEY_CODES:
+            raise RpcError(INVALID_PARAMS, f"tecla desconocida: {key}")
+        target = self.pet(pet)
+        # Igual que el teclado, pero sin necesitar el foco
+        target.pending_inputs.append((KEY_CODES[key], bool(pressed)))
+        target.wake()
+        return True
+
+    def rpc_query(self, client, pet):
+        target = self.pet(pet)
+        state = target.engine.pet
+        return {
+            "state": target.engine.state_name,
+            "facing": FACING_NAMES[state.facing],
+            "frame": state.frame_index,
+            "x": target.x(),
+            "y": target.y(),
+            "visible": target.isVisible(),
+        }
+
+    def rpc_subscribe(self, client, events=EVENTS):
+        unknown = set(events) - set(EVENTS)
+        if unknown:
+            raise RpcError(INVALID_PARAMS, f"eventos desconocidos: {sorted(unknown)}")
+        client.events.update(events)
+        return sorted(client.events)
+
+
+def coordinate(value):
+    # Número finito dentro de lo que admite una ventana de Qt
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise RpcError(INVALID_PARAMS, f"coordenada no numérica: {value!r}")
+    if not math.isfinite(value) or abs(value) > COORD_LIMIT:
+        raise RpcError(INVALID_PARAMS, f"coordenada fuera de rango: {value!r}")
+    return int(value)
+
+
+def error_response(request_id, code, message):
+    return {"jsonrpc": "2.0", "id": request_id, "error": {"code": code, "message": message}}
+
+
+def main():
+    # Cliente mínimo: envía una línea (petición o lote) e imprime la respuesta
+    parser = argparse.ArgumentParser(description="Enviar comandos JSON-RPC al pingüino")
+    parser.add_argument("message", help='p. ej. \'{"jsonrpc": "2.0", "id": 1, "method": "list"}\'')
+    parser.add_argument("--name", default=SERVER_NAME)
+    parser.add_argument("--timeout", type=int, default=2000, help="milisegundos")
+    args = parser.parse_args()
+
+    socket = QLocalSocket()
+    socket.connectToServer(args.name)
+    if not socket.waitForConnected(args.timeout):
+        print(f"No se pudo conectar: {socket.errorString()}", file=sys.stderr)
+        return 1
+    socket.write(args.message.encode("utf-8") + b"\n")
+    socket.waitForBytesWritten(args.timeout)
+    data = b""
+    while not data.endswith(b"\n") and socket.waitForReadyRead(args.timeout):
+        data += bytes(socket.readAll())
+    print(data.decode("utf-8").strip())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,319 @@
+import math
+import random
+
+from petlog import log
+from animations import load_manifest, LOOP, MOTION_LINEAR, MOTION_ARC, MOTION_BOUNCE
+
+# Núcleo de simulación del pingüino, sin dependencias de Qt. PenguinCharacter
+# solo se encarga de dibujar el estado que produce PetEngine.step().
+#
+# Las animaciones (fotogramas, duraciones, transiciones y movimiento) vienen de
+# animations.json; en el tick solo se usan sus ids enteros y las tablas
+# compiladas, sin comparar nombres.
+
+# Códigos de tecla propios del motor (el widget traduce las teclas de Qt)
+KEY_RIGHT, KEY_LEFT, KEY_UP, KEY_DOWN, KEY_A = range(5)
+
+# Orientación: también es el signo de la velocidad horizontal
+RIGHT, LEFT = 1, -1
+FACING_NAMES = {RIGHT: "right", LEFT: "left"}
+
+# Margen para el error de coma flotante al sumar pasos de física: 10 pasos
+# de 0.02s deben completar un fotograma de 0.2s
+FRAME_EPSILON = 1e-9
+
+
+class PetState:
+    __slots__ = (
+        "state", "anim", "facing", "frame_index", "frame_elapsed",
+        "x", "y", "prev_x", "prev_y", "jump_elapsed", "jump_base_y",
+        "slide_dx", "slide_dy", "moving_right", "moving_left", "held",
+    )
+
+    def __init__(self, x=0.0, y=0.0, state=0):
+        self.state = state  # id de la animación (ver AnimationTable.names)
+        self.anim = state  # animación mostrada (la inicial si el estado no tiene fotogramas)
+        self.facing = RIGHT
+        self.frame_index = 0
+        self.frame_elapsed = 0.0
+        # Posición actual y la del paso anterior, para interpolar al dibujar
+        self.x = self.prev_x = float(x)
+        self.y = self.prev_y = float(y)
+        self.jump_elapsed = 0.0
+        self.jump_base_y = self.y
+        # Velocidad del "slide" en píxeles por segundo
+        self.slide_dx = 0.0
+        self.slide_dy = 0.0
+        self.moving_right = False
+        self.moving_left = False
+        self.held = False  # agarrado con el ratón: la animación sigue, el movimiento no
+
+
+class PetEngine:
+    def __init__(self, x=0, y=0, size=(200, 200), bounds=(0, 0, 1920, 1080),
+                 frame_counts=None, table=None, rng=None):
+        self.table = table if table is not None else load_manifest()
+        self.pet = PetState(x, y, self.table.initial)
+        self.width, self.height = size
+        # Límites (izquierda, arriba, derecha, abajo) contra los que rebota el slide
+        self.bounds = bounds
+        # Fotogramas disponibles por animación; frame_counts ({nombre: n})
+        # refleja los que ya están cargados: las que no aparecen se quedan en
+        # 0 (aún no, se muestra la inicial) hasta que llegue set_frame_count
+        self.frame_counts = self.table.frame_counts
+        self.cycle_times = list(self.table.cycle_times)
+        if frame_counts is not None:
+            for anim, name in enumerate(self.table.names):
+                self.set_frame_count(anim, frame_counts.get(name, 0))
+        self.rng = rng if rng is not None else random.Random()
+        # Se llama con el motor al cambiar de estado, agarrarlo o moverlo
+        # desde fuera (lo usa interactions.InteractionWorld)
+        self.watcher = None
+
+        # Estados que usa el control por teclado
+        ids = self.table.ids
+        self.IDLE = ids["idle"]
+        self.WALK = ids["walk"]
+        self.JUMP = ids["jump"]
+        self.ATACK = ids["atack"]
+        self.PRE_SLIDE = ids["pre_slide"]
+        self.SLIDE = ids["slide"]
+
+    @property
+    def state_name(self):
+        return self.table.names[self.pet.state]
+
+    def state_id(self, state):
+        # Acepta el nombre o el id de una animación
+        return self.table.ids[state] if isinstance(state, str) else state
+
+    def step(self, dt, inputs=()):
+        # inputs: secuencia de (tecla, presionada) aplicada antes de avanzar
+        for key, pressed in inputs:
+            self.handle_key(key, pressed)
+
+        pet = self.pet
+        pet.prev_x = pet.x
+        pet.prev_y = pet.y
+        table = self.table
+        state = pet.state
+        motion = table.motion[state]
+
+        # Mientras se arrastra, la posición la decide el ratón
+        if pet.held:
+            pass
+
+        # Velocidad constante; la horizontal sigue la orientación
+        elif motion == MOTION_LINEAR:
+            pet.x += table.velocity_x[state] * pet.facing * dt
+            pet.y += table.velocity_y[state] * dt
+
+        # Salto: arco parabólico que dura lo mismo que la animación
+        elif motion == MOTION_ARC:
+            pet.jump_elapsed += dt
+            t = min(pet.jump_elapsed / self.cycle_times[pet.anim], 1.0)
+            pet.y = pet.jump_base_y - 4 * table.height[state] * t * (1 - t)
+
+        # Diagonal con rebote en los límites
+        elif motion == MOTION_BOUNCE:
+            left, top, right, bottom = self.bounds
+            new_x = pet.x + pet.slide_dx * dt
+            new_y = pet.y + pet.slide_dy * dt
+
+            # Colisión lateral: se invierte dx y se actualiza la orientación
+            if new_x < left:
+                new_x = left
+                pet.slide_dx = -pet.slide_dx
+                pet.facing = RIGHT
+                log.debug("Rebote en pared izquierda, cambiando orientación a 'right'")
+            elif new_x + self.width > right:
+                new_x = right - self.width
+                pet.slide_dx = -pet.slide_dx
+                pet.facing = LEFT
+                log.debug("Rebote en pared derecha, cambiando orientación a 'left'")
+
+            # Colisión vertical: simplemente se invierte dy (no afecta la orientación)
+            if new_y < top:
+                new_y = top
+                pet.slide_dy = -pet.slide_dy
+                log.debug("Rebote en el techo")
+            elif new_y + self.height > bottom:
+                new_y = bottom - self.height
+                pet.slide_dy = -pet.slide_dy
+                log.debug("Rebote en el suelo")
+
+            pet.x = new_x
+            pet.y = new_y
+
+        # Avanzar el fotograma según la duración de cada uno
+        pet.frame_elapsed += dt
+        durations = table.durations[pet.anim]
+        while pet.frame_elapsed >= durations[pet.frame_index] - FRAME_EPSILON:
+            pet.frame_elapsed -= durations[pet.frame_index]
+            if not self.advance_frame():
+                break
+
+    def advance_frame(self):
+        # Las animaciones de un solo uso pasan a su estado siguiente tras
+        # mostrar su último fotograma; devuelve False si hubo cambio de estado
+        pet = self.pet
+        count = self.frame_counts[pet.anim]
+        if pet.frame_index == count - 1:
+            next_state = self.table.next_state[pet.state]
+            if next_state != LOOP:
+                self.set_state(next_state)
+                return False
+        pet.frame_index = (pet.frame_index + 1) % count
+        return True
+
+    def set_state(self, state):
+        state = self.state_id(state)
+        pet = self.pet
+        table = self.table
+        log.debug("Cambio de estado: %s -> %s", table.names[pet.state], table.names[state])
+        # Si se interrumpe un salto, el pingüino vuelve al suelo
+        if table.motion[pet.state] == MOTION_ARC:
+            pet.y = pet.prev_y = pet.jump_base_y
+        pet.state = state
+        pet.frame_index = 0
+        pet.frame_elapsed = 0.0
+
+        motion = table.motion[state]
+        if motion == MOTION_ARC:
+            pet.jump_elapsed = 0.0
+            pet.jump_base_y = pet.y
+
+        # Rebote: generar una dirección aleatoria
+        if motion == MOTION_BOUNCE:
+            # Elegir uno de los 4 ángulos diagonales (en grados)
+            angulo_grados = self.rng.choice([45, 135, 225, 315])
+            angulo = math.radians(angulo_grados)
+
+            # Calcula dx y dy de forma que sean iguales en valor absoluto
+            pet.slide_dx = table.speed[state] * math.cos(angulo)
+            pet.slide_dy = table.speed[state] * math.sin(angulo)
+
+            # Establecer la orientación del pingüino según el signo de dx
+            pet.facing = RIGHT if pet.slide_dx > 0 else LEFT
+            log.debug("Slide: ángulo %d°, dx=%.0f, dy=%.0f", angulo_grados, pet.slide_dx, pet.slide_dy)
+        else:
+            pet.slide_dx = 0.0
+            pet.slide_dy = 0.0
+
+        # Si el estado no tiene fotogramas se muestra la animación inicial
+        pet.anim = state if self.frame_counts[state] else table.initial
+        if self.watcher is not None:
+            self.watcher(self)
+
+    def set_frame_count(self, anim, count):
+        # Una animación terminó de cargarse: si el estado actual la esperaba
+        # (mostrando la inicial mientras tanto), se empieza a mostrar ya
+        anim = self.state_id(anim)
+        self.frame_counts[anim] = count
+        self.cycle_times[anim] = sum(self.table.durations[anim][:count])
+        pet = self.pet
+        if count and pet.state == anim and pet.anim != anim:
+            pet.anim = anim
+            pet.frame_index = 0
+
+    def handle_key(self, key, pressed):
+        pet = self.pet
+        state = pet.state
+        if pressed:
+            if key == KEY_RIGHT:
+                pet.moving_right = True
+                pet.facing = RIGHT
+                if state not in (self.WALK, self.JUMP, self.SLIDE, self.PRE_SLIDE):
+                    self.set_state(self.WALK)
+            elif key == KEY_LEFT:
+                pet.moving_left = True
+                pet.facing = LEFT
+                if state not in (self.WALK, self.JUMP, self.SLIDE, self.PRE_SLIDE):
+                    self.set_state(self.WALK)
+            elif key == KEY_UP:
+                if state != self.JUMP:
+                    self.set_state(self.JUMP)
+            elif key == KEY_DOWN:
+                # Al presionar la tecla, iniciamos pre_slide
+                if state != self.PRE_SLIDE and state != self.SLIDE:
+                    self.set_state(self.PRE_SLIDE)
+            elif key == KEY_A:
+                if state != self.ATACK:
+                    self.set_state(self.ATACK)
+        else:
+            if key == KEY_RIGHT:
+                pet.moving_right = False
+            elif key == KEY_LEFT:
+                pet.moving_left = False
+            elif key == KEY_DOWN:
+                if state == self.PRE_SLIDE or state == self.SLIDE:
+                    self.set_state(self.IDLE)
+            # Solo si ninguna tecla lateral está presionada, se vuelve a idle
+            if not (pet.moving_right or pet.moving_left) and pet.state == self.WALK:
+                self.set_state(self.IDLE)
+
+    def move_to(self, x, y):
+        # Reubica la simulación (p. ej. al arrastrar) sin interpolar
+        pet = self.pet
+        if self.table.motion[pet.state] == MOTION_ARC:
+            pet.jump_base_y += y - pet.y
+        pet.x = pet.prev_x = float(x)
+        pet.y = pet.prev_y = float(y)
+        if self.watcher is not None:
+            self.watcher(self)
+
+    def nudge(self, dx, dy):
+        # Desplazamiento externo (empujones entre pingüinos). No empuja fuera
+        # de los límites, aunque tampoco recoloca al que ya estaba fuera. La
+        # posición anterior se desplaza igual, para que no cuente como
+        # movimiento propio en el siguiente paso
+        pet = self.pet
+        left, top, right, bottom = self.bounds
+        x = pet.x + dx
+        y = pet.y + dy
+        if dx < 0:
+            x = max(x, min(left, pet.x))
+        elif dx > 0:
+            x = min(x, max(right - self.width, pet.x))
+        if dy < 0:
+            y = max(y, min(top, pet.y))
+        elif dy > 0:
+            y = min(y, max(bottom - self.height, pet.y))
+        if self.table.motion[pet.state] == MOTION_ARC:
+            pet.jump_base_y += y - pet.y
+        pet.prev_x += x - pet.x
+        pet.prev_y += y - pet.y
+        pet.x = x
+        pet.y = y
+        if self.watcher is not None:
+            self.watcher(self)
+
+    def set_slide_velocity(self, dx, dy):
+        # Rebote contra otro pingüino: la orientación sigue al signo de dx
+        pet = self.pet
+        pet.slide_dx = dx
+        pet.slide_dy = dy
+        if dx:
+            pet.facing = RIGHT if dx > 0 else LEFT
+
+    def set_held(self, held):
+        # Agarrar o soltar al pingüino; al soltarlo sigue con su estado. Un
+        # salto agarrado a medias termina donde se suelte, no en su base
+        pet = self.pet
+        pet.held = held
+        if held and self.table.motion[pet.state] == MOTION_ARC:
+            pet.jump_base_y = pet.y
+        if self.watcher is not None:
+            self.watcher(self)
+
+    def time_to_next_frame(self):
+        # Segundos de simulación hasta el próximo cambio de fotograma
+        pet = self.pet
+        frame_time = self.table.durations[pet.anim][pet.frame_index]
+        return max(0.0, frame_time - FRAME_EPSILON - pet.frame_elapsed)
+
+    def interpolated(self, alpha):
+        # Posición de dibujado entre el paso anterior y el actual
+        pet = self.pet
+        return (pet.prev_x + (pet.x - pet.prev_x) * alpha,
+                pet.prev_y + (pet.y - pet.prev_y) * alpha)
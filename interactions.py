@@ -0,0 +1,332 @@
+import math
+import time
+
+from petlog import log
+from animations import MOTION_NONE, MOTION_ARC, MOTION_BOUNCE
+
+# Interacciones entre pingüinos, sin Qt: empujones, rebotes entre los que
+# hacen "slide" y golpes del "atack". El planificador registra los motores de
+# los pingüinos visibles (add/remove) y llama a resolve() una vez por tick,
+# después de avanzar la física y antes de dibujar.
+#
+# Cada pingüino es un círculo centrado en su widget. El mundo no recorre a
+# todos los pingüinos en cada tick: el motor avisa (PetEngine.watcher) cuando
+# cambia de estado, lo agarran o lo mueven desde fuera, y solo entonces se
+# reclasifica. Los quietos viven en una rejilla uniforme (hash espacial) que
+# se mantiene entre ticks; los activos (moviéndose, atacando o agarrados) se
+# reparten en otra rejilla en cada tick y solo se buscan vecinos alrededor de
+# ellos, así que cientos de pingüinos quietos no cuestan nada. Los que saltan
+# están en el aire: no chocan con nadie.
+
+# Radio de colisión respecto al ancho del widget (el sprite tiene margen)
+RADIUS_FACTOR = 0.3
+# Alcance del golpe, en radios, y empujón que recibe el golpeado
+ATTACK_REACH = 2.5
+KNOCKBACK = 20.0
+# Presupuesto de resolve() por tick, en segundos (None = sin límite). Es un
+# tope para no perder fotogramas, no el coste normal: con la pantalla llena
+# de pingüinos deslizándose la pasada completa cuesta varios ms, y entonces
+# los activos que no dé tiempo a mirar (skipped) se quedan sin comprobar en
+# ese tick y pasan los primeros en el siguiente. El resultado depende del
+# reloj (solo queda fuera devolver las posiciones corregidas)
+BUDGET = 0.0005
+
+# Clase de cada pingüino registrado
+AIR, STILL, ACTIVE = range(3)
+
+# Celdas vecinas con la clave entera de cell_key. Las celdas miden la
+# distancia de contacto: basta mirar las 3x3 vecinas, y entre activos solo la
+# mitad "hacia delante" (cada pareja una vez). El golpe llega más lejos, pero
+# solo hacia donde mira el que ataca: dos columnas por delante y 5 filas
+NEIGHBORS = [(dx << 20) + dy for dx in (-1, 0, 1) for dy in (-1, 0, 1)]
+FORWARD = [(1 << 20) - 1, 1 << 20, (1 << 20) + 1, 1]
+ATTACK_FRONT = {facing: [((dx * facing) << 20) + dy for dx in range(3) for dy in range(-2, 3)]
+                for facing in (1, -1)}
+
+
+def cell_key(x, y, cell):
+    # Columna y fila empaquetadas en un entero (|fila| < 2^19)
+    return (int(x // cell) << 20) + int(y // cell)
+
+
+class InteractionWorld:
+    def __init__(self, budget=BUDGET):
+        self.budget = budget
+        # Por ranura (índice estable mientras el motor esté registrado)
+        self.engines = []  # None = ranura libre
+        self.kinds = []
+        self.xs = []  # centros; al día para los quietos entre ticks
+        self.ys = []
+        self.cells = []  # celda de cada quieto en la rejilla
+        self.slots = {}  # motor -> ranura
+        self.free = []
+        self.still = {}  # rejilla de los quietos: celda -> [ranuras]
+        self.movers = {}  # ranuras activas (dict: orden de inserción estable)
+        self.pending = set()  # ranuras que el motor avisó que cambiaron
+        self.half_width = 0.0
+        self.min_dist = self.reach = self.cell = 1.0
+        # Golpes ya dados: (atacante, golpeado) mientras dure el ataque
+        self.hits = set()
+        self.contacts = 0
+        self.skipped = 0  # activos que la última pasada dejó sin mirar
+        self.cursor = 0  # primer activo a mirar en el siguiente tick
+
+    def add(self, engine):
+        if engine in self.slots:
+            return
+        if self.free:
+            slot = self.free.pop()
+        else:
+            slot = len(self.engines)
+            for values in (self.engines, self.kinds, self.xs, self.ys, self.cells):
+                values.append(None)
+        self.engines[slot] = engine
+        self.kinds[slot] = AIR
+        self.slots[engine] = slot
+        engine.watcher = self.changed
+        if engine.width * 0.5 > self.half_width:
+            self.half_width = engine.width * 0.5
+            self.resize()
+        self.classify(slot)
+
+    def remove(self, engine):
+        slot = self.slots.pop(engine, None)
+        if slot is None:
+            return
+        self.leave(slot)
+        engine.watcher = None
+        self.pending.discard(slot)
+        self.engines[slot] = None
+        self.free.append(slot)
+        if self.hits:
+            self.hits = {hit for hit in self.hits if engine not in hit}
+
+    def changed(self, engine):
+        # Aviso del motor: se reclasifica al empezar el siguiente resolve()
+        self.pending.add(self.slots[engine])
+
+    def resize(self):
+        # Ha entrado un pingüino más ancho: distancias y celdas nuevas. Las
+        # celdas no se encogen al quitarlo (más grandes siguen siendo válidas)
+        radius = self.half_width * 2 * RADIUS_FACTOR
+        self.min_dist = 2 * radius
+        self.reach = ATTACK_REACH * radius
+        # El golpe debe caber en las 5x5 vecinas
+        assert self.reach <= 2 * self.min_dist
+        self.cell = self.min_dist
+        self.still = {}
+        for slot, kind in enumerate(self.kinds):
+            if kind == STILL:
+                self.insert(slot)
+
+    def classify(self, slot):
+        engine = self.engines[slot]
+        pet = engine.pet
+        motion = engine.table.motion[pet.state]
+        if pet.held or pet.state == engine.ATACK or (motion != MOTION_NONE and motion != MOTION_ARC):
+            kind = ACTIVE
+        elif motion == MOTION_ARC:
+            kind = AIR
+        else:
+            kind = STILL
+        if kind == ACTIVE and self.kinds[slot] == ACTIVE:
+            return
+        self.leave(slot)
+        self.kinds[slot] = kind
+        if kind == STILL:
+            self.xs[slot] = pet.x + engine.width * 0.5
+            self.ys[slot] = pet.y + engine.height * 0.5
+            self.insert(slot)
+        elif kind == ACTIVE:
+            self.movers[slot] = None
+
+    def insert(self, slot):
+        key = self.cells[slot] = cell_key(self.xs[slot], self.ys[slot], self.cell)
+        bucket = self.still.get(key)
+        if bucket is None:
+            self.still[key] = [slot]
+        else:
+            bucket.append(slot)
+
+    def leave(self, slot):
+        kind = self.kinds[slot]
+        if kind == STILL:
+            key = self.cells[slot]
+            bucket = self.still[key]
+            bucket.remove(slot)
+            if not bucket:
+                del self.still[key]
+        elif kind == ACTIVE:
+            del self.movers[slot]
+        self.kinds[slot] = AIR
+
+    def resolve(self):
+        # Devuelve cuántos contactos se resolvieron (0 = nada que redibujar)
+        self.skipped = 0
+        deadline = time.perf_counter() + self.budget if self.budget is not None else math.inf
+        if self.pending:
+            pending, self.pending = self.pending, set()
+            for slot in pending:
+                if self.engines[slot] is not None:
+                    self.classify(slot)
+        if self.hits:
+            self.hits = {hit for hit in self.hits if hit[0].pet.state == hit[0].ATACK}
+        movers = self.movers
+        # Sin activos no puede haber contactos nuevos
+        if not movers or len(self.slots) < 2:
+            return 0
+
+        engines, xs, ys = self.engines, self.xs, self.ys
+        cell = self.cell
+        min_sq = self.min_dist * self.min_dist
+        reach_sq = self.reach * self.reach
+        # Los activos se mueven en cada paso: su rejilla se rehace aquí
+        grid = {}
+        bases = {}
+        for i in movers:
+            engine = engines[i]
+            pet = engine.pet
+            x = xs[i] = pet.x + engine.width * 0.5
+            y = ys[i] = pet.y + engine.height * 0.5
+            key = bases[i] = (int(x // cell) << 20) + int(y // cell)
+            bucket = grid.get(key)
+            if bucket is None:
+                grid[key] = [i]
+            else:
+                bucket.append(i)
+
+        self.contacts = 0
+        touched = set()
+        still = self.still
+        strike, collide = self.strike, self.collide
+        order = list(movers)
+        start = self.cursor if self.cursor < len(order) else 0
+        if start:
+            order = order[start:] + order[:start]
+        self.cursor = 0
+        for n, i in enumerate(order):
+            if n & 3 == 3 and time.perf_counter() > deadline:
+                self.cursor = (start + n) % len(order)
+                self.skipped = len(order) - n
+                break
+            # Posición ya corregida por los contactos anteriores, pero la
+            # celda en la que se repartió
+            x, y = xs[i], ys[i]
+            base = bases[i]
+            pet = engines[i].pet
+            if pet.state == engines[i].ATACK:
+                # Golpes: solo a los que tiene delante, activos o quietos
+                facing = pet.facing
+                for offset in ATTACK_FRONT[facing]:
+                    for bucket in (grid.get(base + offset), still.get(base + offset)):
+                        if bucket is None:
+                            continue
+                        for j in bucket:
+                            dx = xs[j] - x
+                            dy = ys[j] - y
+                            if dx * facing > 0 and dx * dx + dy * dy < reach_sq:
+                                strike(i, j, touched)
+
+            # Contra los otros activos, cada pareja una vez
+            for j in grid[base]:
+                if j > i:
+                    dx = xs[j] - x
+                    dy = ys[j] - y
+                    dist_sq = dx * dx + dy * dy
+                    if dist_sq < min_sq:
+                        collide(i, j, dx, dy, math.sqrt(dist_sq), touched)
+            for offset in FORWARD:
+                bucket = grid.get(base + offset)
+                if bucket is not None:
+                    for j in bucket:
+                        dx = xs[j] - x
+                        dy = ys[j] - y
+                        dist_sq = dx * dx + dy * dy
+                        if dist_sq < min_sq:
+                            collide(i, j, dx, dy, math.sqrt(dist_sq), touched)
+            # Contra los quietos (si los hay)
+            if not still:
+                continue
+            for offset in NEIGHBORS:
+                bucket = still.get(base + offset)
+                if bucket is not None:
+                    for j in bucket:
+                        dx = xs[j] - x
+                        dy = ys[j] - y
+                        dist_sq = dx * dx + dy * dy
+                        if dist_sq < min_sq:
+                            collide(i, j, dx, dy, math.sqrt(dist_sq), touched)
+
+        # Devolver a los motores las posiciones corregidas (el aviso del motor
+        # vuelve a colocar a los quietos en la rejilla)
+        for i in touched:
+            engine = engines[i]
+            engine.nudge(xs[i] - engine.width * 0.5 - engine.pet.x,
+                         ys[i] - engine.height * 0.5 - engine.pet.y)
+        return self.contacts
+
+    def strike(self, i, j, touched):
+        # Golpe de i a j (ya se sabe que lo tiene delante y a su alcance)
+        attacker, target = self.engines[i], self.engines[j]
+        if (attacker, target) in self.hits or target.pet.held:
+            return
+        self.hits.add((attacker, target))
+        self.xs[j] += KNOCKBACK * attacker.pet.facing
+        touched.add(j)
+        target.set_state(target.JUMP)
+        self.contacts += 1
+        log.debug("Golpe de ataque entre pingüinos")
+
+    def collide(self, i, j, dx, dy, dist, touched):
+        # Contacto: se separan y, si alguno desliza, rebota
+        a, b = self.engines[i], self.engines[j]
+        pa, pb = a.pet, b.pet
+        if dist > 0:
+            nx, ny = dx / dist, dy / dist
+        else:
+            nx, ny = 1.0, 0.0
+        overlap = self.min_dist - dist
+
+        bounce_a = a.table.motion[pa.state] == MOTION_BOUNCE and not pa.held
+        bounce_b = b.table.motion[pb.state] == MOTION_BOUNCE and not pb.held
+        if bounce_a and bounce_b:
+            # Choque elástico de masas iguales: intercambian la componente normal
+            approach = (pb.slide_dx - pa.slide_dx) * nx + (pb.slide_dy - pa.slide_dy) * ny
+            if approach < 0:
+                a.set_slide_velocity(pa.slide_dx + approach * nx, pa.slide_dy + approach * ny)
+                b.set_slide_velocity(pb.slide_dx - approach * nx, pb.slide_dy - approach * ny)
+            share_a = share_b = 0.5
+        elif bounce_a or bounce_b:
+            # El que desliza rebota contra el otro como contra una pared
+            slider, sign = (a, 1) if bounce_a else (b, -1)
+            vx, vy = slider.pet.slide_dx, slider.pet.slide_dy
+            towards = (vx * nx + vy * ny) * sign
+            if towards > 0:
+                slider.set_slide_velocity(vx - 2 * towards * nx * sign, vy - 2 * towards * ny * sign)
+            share_a, share_b = (1.0, 0.0) if bounce_a else (0.0, 1.0)
+        else:
+            # Empujón: se aparta el que no se movía en el último paso; si se
+            # movían los dos, a medias
+            moving_a = pa.x != pa.prev_x or pa.y != pa.prev_y
+            moving_b = pb.x != pb.prev_x or pb.y != pb.prev_y
+            if moving_a and moving_b:
+                share_a = share_b = 0.5
+            elif moving_a:
+                share_a, share_b = 0.0, 1.0
+            else:
+                share_a, share_b = 1.0, 0.0
+        # Al que está agarrado no se le mueve
+        if pa.held:
+            share_a, share_b = 0.0, (1.0 if not pb.held else 0.0)
+        elif pb.held:
+            share_a, share_b = 1.0, 0.0
+
+        if share_a:
+            self.xs[i] -= nx * overlap * share_a
+            self.ys[i] -= ny * overlap * share_a
+            touched.add(i)
+        if share_b:
+            self.xs[j] += nx * overlap * share_b
+            self.ys[j] += ny * overlap * share_b
+            touched.add(j)
+        self.contacts += 1
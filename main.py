@@ -1,10 +1,142 @@
+import os
 import sys
-from PyQt5.QtWidgets import QApplication
-from penguin import PenguinCharacter
+import time
+import argparse
+
+# Referencia para medir el arranque (--startup-report); PyQt5 y el resto se
+# importan después de leer los argumentos, y solo lo que se vaya a usar
+STARTED = time.perf_counter()
+
+# Perfiles de rendimiento. Las opciones sueltas (--pets, --size) mandan
+# sobre las del perfil.
+PROFILES = {
+    # Animación fluida para uno o pocos pingüinos
+    "smooth": {"render_hz": 60, "physics_hz": 50, "nap_after": 120.0, "pets": 1, "size": 200},
+    # Portátiles con batería: menos ticks y siesta antes
+    "low-power": {"render_hz": 20, "physics_hz": 25, "nap_after": 30.0, "pets": 1, "size": 200},
+    # Muchos pingüinos pequeños a la vez
+    "multi-pet": {"render_hz": 30, "physics_hz": 25, "nap_after": 60.0, "pets": 10, "size": 128},
+}
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Pingüino virtual de escritorio")
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="smooth",
+                        help="perfil de rendimiento (por defecto smooth)")
+    parser.add_argument("--pets", type=int,
+                        help="número de pingüinos (comparten sprites y timer)")
+    parser.add_argument("--size", type=int, help="tamaño de cada pingüino en píxeles")
+    parser.add_argument("--debug", action="store_true",
+                        default=bool(os.environ.get("PENGUIN_DEBUG")),
+                        help="guardar mensajes de depuración en el registro en memoria")
+    parser.add_argument("--log-console", action="store_true",
+                        help="escribir también el registro en stderr")
+    parser.add_argument("--rocketchat", nargs="?", const="config.json", metavar="CONFIG",
+                        help="avisar de mensajes sin leer de Rocket.Chat (por defecto config.json)")
+    parser.add_argument("--record", metavar="TRACE",
+                        help="grabar la sesión del primer pingüino en este archivo (ver pettrace.py)")
+    parser.add_argument("--auto", action="store_true",
+                        help="modo autónomo: los pingüinos pasean solos (ver behavior.py)")
+    parser.add_argument("--control", nargs="?", const="penguin-control", metavar="NAME",
+                        help="aceptar comandos JSON-RPC por un socket local (ver control.py)")
+    parser.add_argument("--plugins", nargs="?", const="plugins.json", metavar="CONFIG",
+                        help="ejecutar las tareas de plugins en procesos aparte (por defecto plugins.json)")
+    parser.add_argument("--startup-report", action="store_true",
+                        help="imprimir los tiempos de arranque en JSON al primer fotograma y salir")
+    args, qt_args = parser.parse_known_args(argv)
+    profile = PROFILES[args.profile]
+    if args.pets is None:
+        args.pets = profile["pets"]
+    if args.size is None:
+        args.size = profile["size"]
+    return args, qt_args, profile
+
+
+def main(argv=None):
+    args, qt_args, profile = parse_args(sys.argv[1:] if argv is None else argv)
+
+    import petlog
+    petlog.configure(debug=args.debug or args.log_console, console=args.log_console)
+    from PyQt5.QtCore import QTimer
+    from PyQt5.QtWidgets import QApplication
+    app = QApplication(sys.argv[:1] + qt_args)
+    from penguin import PenguinCharacter
+    from scheduler import PetScheduler
+    imported = time.perf_counter()
+
+    scheduler = PetScheduler.shared(render_hz=profile["render_hz"], physics_hz=profile["physics_hz"])
+    penguins = []
+    services = []  # mantiene vivos notificador, control y plugins
+
+    def add_penguin(position):
+        penguin = PenguinCharacter(scheduler, position, args.size)
+        penguin.nap_after = profile["nap_after"]
+        penguin.show()
+        penguin.setAutonomous(args.auto)
+        penguins.append(penguin)
+        return penguin
+
+    def position(i):
+        # Repartir los pingüinos en filas de 10 desde la posición inicial
+        step = args.size * 3 // 4
+        return 1600 - (i % 10) * step, 800 - (i // 10) * step
+
+    # Solo el primer pingüino antes del primer fotograma; todo lo demás se
+    # prepara en la primera vuelta del bucle de eventos
+    add_penguin(position(0)).setFocus()
+
+    def start_services():
+        for i in range(1, max(1, args.pets)):
+            add_penguin(position(i))
+        if args.record:
+            penguins[0].startRecording(args.record)
+
+        if args.rocketchat:
+            # Solo se importa (y se necesita requests) si se pide
+            from notifier import RocketChatNotifier
+            notifier = RocketChatNotifier.from_config(args.rocketchat)
+            for penguin in penguins:
+                notifier.unreadChanged.connect(penguin.onUnreadChanged)
+            notifier.newMessages.connect(penguins[0].onNewMessages)
+            app.aboutToQuit.connect(notifier.stop)
+            notifier.start()
+            services.append(notifier)
+
+        if args.control:
+            from control import ControlServer
+            control = ControlServer(scheduler, lambda x, y: add_penguin((x, y)), args.control)
+            for penguin in penguins:
+                control.add_pet(penguin)
+            services.append(control)
+
+        if args.plugins:
+            from plugins import PluginRuntime
+            runtime = PluginRuntime()
+            runtime.finished.connect(penguins[0].onPluginFinished)
+            app.aboutToQuit.connect(runtime.shutdown)
+            runtime.load(args.plugins)
+            services.append(runtime)
+
+    QTimer.singleShot(0, start_services)
+
+    if args.startup_report:
+        def report():
+            # Se encola después de la medición del primer fotograma del pingüino
+            import json
+            first = penguins[0]
+            first_frame = first.created_at + first.first_frame_ms / 1000
+            print(json.dumps({
+                "profile": args.profile,
+                "imports_ms": (imported - STARTED) * 1000,
+                "first_frame_ms": (first_frame - STARTED) * 1000,
+                "ready_ms": (time.perf_counter() - STARTED) * 1000,
+                "modules": len(sys.modules),
+            }), flush=True)
+            app.quit()
+        QTimer.singleShot(0, report)
+
+    return app.exec_()
+
 
 if __name__ == "__main__":
-    app = QApplication(sys.argv)
-    penguin = PenguinCharacter()
-    penguin.show()
-    penguin.setFocus()
-    sys.exit(app.exec_())
+    sys.exit(main())
@@ -0,0 +1,121 @@
+import os
+import json
+import time
+import bisect
+import tempfile
+import collections
+
+# Instrumentación de los ticks: duración de cada tick, jitter del timer,
+# fotogramas perdidos y tiempo pasado en cada estado. Todo se acumula en
+# contadores y colas acotadas, así que el coste por tick es constante.
+
+# Límites (en ms) de los cubos del histograma de duración de tick
+TICK_BUCKETS_MS = (0.25, 0.5, 1, 2, 4, 8, 16, 33)
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class FrameStats:
+    def __init__(self, expected_interval, window=600):
+        self.expected_interval = expected_interval  # segundos entre ticks
+        self.started = time.perf_counter()
+        self.ticks = 0
+        self.dropped_frames = 0
+        self.last_tick = None
+        # Últimos valores (en segundos) para medias y percentiles
+        self.tick_durations = collections.deque(maxlen=window)
+        self.jitters = collections.deque(maxlen=window)
+        self.tick_histogram = [0] * (len(TICK_BUCKETS_MS) + 1)
+        self.max_tick = 0.0
+        self.state_time = collections.defaultdict(float)
+        # nombre -> [llamadas, tiempo total, máximo]
+        self.calls = collections.defaultdict(lambda: [0, 0.0, 0.0])
+
+    def set_expected_interval(self, seconds):
+        # El intervalo que está en curso se programó con el ritmo anterior: no
+        # se mide (si no, daría fotogramas perdidos y jitter que no existen)
+        if seconds != self.expected_interval:
+            self.expected_interval = seconds
+            self.last_tick = None
+
+    def tick_started(self):
+        now = time.perf_counter()
+        if self.last_tick is not None:
+            interval = now - self.last_tick
+            self.jitters.append(interval - self.expected_interval)
+            # Un intervalo de más de 1.5 veces el esperado es un fotograma perdido
+            if interval > 1.5 * self.expected_interval:
+                self.dropped_frames += int(interval / self.expected_interval + 0.5) - 1
+        self.last_tick = now
+        return now
+
+    def tick_finished(self, started):
+        duration = time.perf_counter() - started
+        self.ticks += 1
+        self.tick_durations.append(duration)
+        self.tick_histogram[bisect.bisect_left(TICK_BUCKETS_MS, duration * 1000)] += 1
+        if duration > self.max_tick:
+            self.max_tick = duration
+
+    def add_state_time(self, state, seconds):
+        self.state_time[state] += seconds
+
+    def add_call(self, name, seconds):
+        entry = self.calls[name]
+        entry[0] += 1
+        entry[1] += seconds
+        if seconds > entry[2]:
+            entry[2] = seconds
+
+    def summary(self):
+        durations = list(self.tick_durations)
+        jitters = list(self.jitters)
+        elapsed = time.perf_counter() - self.started
+        labels = [f"<{limit}ms" for limit in TICK_BUCKETS_MS] + [f">={TICK_BUCKETS_MS[-1]}ms"]
+        return {
+            "elapsed_s": elapsed,
+            "ticks": self.ticks,
+            "expected_interval_ms": self.expected_interval * 1000,
+            "ticks_per_s": self.ticks / elapsed if elapsed else 0.0,
+            "dropped_frames": self.dropped_frames,
+            "tick_ms": {
+                "mean": sum(durations) / len(durations) * 1000 if durations else 0.0,
+                "p95": percentile(durations, 0.95) * 1000,
+                "max": self.max_tick * 1000,
+            },
+            "jitter_ms": {
+                "mean_abs": sum(abs(j) for j in jitters) / len(jitters) * 1000 if jitters else 0.0,
+                "p95_abs": percentile([abs(j) for j in jitters], 0.95) * 1000,
+            },
+            "tick_histogram": dict(zip(labels, self.tick_histogram)),
+            "state_time_s": dict(self.state_time),
+            "calls": {
+                name: {"count": count, "mean_ms": total / count * 1000, "max_ms": peak * 1000}
+                for name, (count, total, peak) in self.calls.items()
+            },
+        }
+
+    def overlay_lines(self):
+        s = self.summary()
+        return [
+            f"{s['ticks_per_s']:.0f} ticks/s  perdidos {s['dropped_frames']}",
+            f"tick {s['tick_ms']['mean']:.2f}ms p95 {s['tick_ms']['p95']:.2f}ms",
+            f"jitter {s['jitter_ms']['mean_abs']:.2f}ms p95 {s['jitter_ms']['p95_abs']:.2f}ms",
+        ]
+
+    def export(self, path=None, extra=None):
+        # Guarda el resumen (más `extra`, si se da) como JSON y devuelve la ruta
+        if path is None:
+            name = time.strftime("penguin-stats-%Y%m%d-%H%M%S.json")
+            path = os.path.join(tempfile.gettempdir(), name)
+        summary = self.summary()
+        if extra:
+            summary.update(extra)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
+        return path
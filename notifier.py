@@ -0,0 +1,96 @@
+import threading
+
+import requests
+from PyQt5.QtCore import QObject, pyqtSignal
+
+from petlog import log
+from api_rocketchat import RocketChatClient, load_config
+
+
+class RocketChatNotifier(QObject):
+    # Consulta Rocket.Chat en un hilo propio y avisa con señales, que Qt
+    # entrega en el hilo de la interfaz: el timer de animación nunca espera a
+    # la red. Cada consulta pide solo los cambios desde la anterior
+    # (updatedSince) y los errores se reintentan con espera exponencial.
+
+    unreadChanged = pyqtSignal(int, list)  # total y canales con pendientes
+    newMessages = pyqtSignal(int)  # mensajes nuevos desde el último aviso
+
+    def __init__(self, client, interval=30.0, max_interval=600.0, parent=None):
+        super().__init__(parent)
+        self.client = client
+        self.interval = interval
+        self.max_interval = max_interval
+        self.failures = 0
+        # id de suscripción -> {"nombre", "mensajes_pendientes"}; solo lo
+        # toca el hilo de consulta
+        self.unread = {}
+        # La primera consulta correcta trae todos los pendientes que ya había
+        # al arrancar: es la referencia, no mensajes nuevos
+        self.synced = False
+        self.stopping = threading.Event()
+        self.thread = None
+
+    @classmethod
+    def from_config(cls, path, parent=None):
+        config = load_config(path)
+        return cls(RocketChatClient.from_config(config),
+                   config.get("poll_interval", 30.0), parent=parent)
+
+    def start(self):
+        if self.thread is None:
+            self.stopping.clear()
+            self.thread = threading.Thread(target=self.run, name="rocketchat", daemon=True)
+            self.thread.start()
+
+    def stop(self, timeout=1.0):
+        # No espera más de `timeout` a una petición en curso: el hilo es daemon
+        self.stopping.set()
+        if self.thread is not None:
+            self.thread.join(timeout)
+            if not self.thread.is_alive():
+                self.client.close()
+            self.thread = None
+
+    def run(self):
+        while not self.stopping.is_set():
+            try:
+                updated, removed = self.client.fetch_changes()
+                self.apply(updated, removed)
+            except (requests.RequestException, ValueError) as e:
+                delay = self.backoff()
+                log.warning("Rocket.Chat: fallo %d (%s), reintento en %.0fs",
+                            self.failures, e, delay)
+            except Exception:
+                # Respuesta con otra forma (KeyError, TypeError...): si la
+                # excepción escapara, el hilo moriría y no habría más avisos
+                delay = self.backoff()
+                log.exception("Rocket.Chat: respuesta inesperada, fallo %d, reintento en %.0fs",
+                              self.failures, delay)
+            else:
+                self.failures = 0
+                delay = self.interval
+            self.stopping.wait(delay)
+
+    def backoff(self):
+        self.failures += 1
+        return min(self.interval * 2 ** self.failures, self.max_interval)
+
+    def apply(self, updated, removed):
+        previous = sum(canal["mensajes_pendientes"] for canal in self.unread.values())
+        # Se trabaja sobre una copia: si la respuesta trae datos de otra forma
+        # y algo falla, el estado anterior queda intacto
+        unread = dict(self.unread)
+        unread.update(updated)
+        for subscription_id in removed:
+            unread.pop(subscription_id, None)
+        total = sum(canal["mensajes_pendientes"] for canal in unread.values())
+        self.unread = unread
+        if total != previous:
+            log.debug("Rocket.Chat: %d mensajes sin leer", total)
+            channels = [dict(canal) for canal in self.unread.values()
+                        if canal["mensajes_pendientes"] > 0]
+            self.unreadChanged.emit(total, channels)
+        if total > previous and self.synced:
+            self.newMessages.emit(total - previous)
+        self.synced = True
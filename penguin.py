@@ -1,318 +1,431 @@
-import sys
-import random
-import math
-from PyQt5.QtWidgets import QWidget, QLabel, QMenu, QDesktopWidget, QApplication
-from PyQt5.QtGui import QPixmap, QTransform
-from PyQt5.QtCore import Qt, QTimer, QPoint
+import time
+from PyQt5.QtWidgets import QWidget, QMenu, QApplication, QMessageBox
+from PyQt5.QtGui import QPainter, QColor, QFont, QRegion
+from PyQt5.QtCore import Qt, QTimer, QRect, QEvent, pyqtSignal
+
+import sprites
+from engine import PetEngine, KEY_RIGHT, KEY_LEFT, KEY_UP, KEY_DOWN, KEY_A, RIGHT, FACING_NAMES
+from scheduler import PetScheduler
+from screens import ScreenBounds
+import petlog
+from petlog import log
+
+# Traducción de las teclas de Qt a los códigos del motor
+KEY_MAP = {
+    Qt.Key_Right: KEY_RIGHT,
+    Qt.Key_Left: KEY_LEFT,
+    Qt.Key_Up: KEY_UP,
+    Qt.Key_Down: KEY_DOWN,
+    Qt.Key_A: KEY_A,
+}
+KEY_NAMES = {
+    KEY_RIGHT: "derecha",
+    KEY_LEFT: "izquierda",
+    KEY_UP: "arriba",
+    KEY_DOWN: "abajo",
+    KEY_A: "A",
+}
 
 class PenguinCharacter(QWidget):
-    def __init__(self):
+    stateChanged = pyqtSignal(str)  # nombre del nuevo estado
+    closed = pyqtSignal()
+    userActivity = pyqtSignal()  # tecla, clic o menú del usuario (no del modo autónomo)
+
+    def __init__(self, scheduler=None, position=(1600, 800), size=200):
         super().__init__()
+        self.created_at = time.perf_counter()
+        self.first_frame_ms = None
         self.setFocusPolicy(Qt.StrongFocus)
         self.setContextMenuPolicy(Qt.DefaultContextMenu)  # Para que se active el menú contextual
-        self.initUI()
+        self.initUI(position, size)
         self.loadAnimations()
-        self.current_state = "idle"
-        self.current_frame_index = 0
-        self.facing = "right"  # "right" o "left"
-        self.speed = 10  # píxeles de movimiento por actualización
-        self.moving_right = False
-        self.moving_left = False
-        
-        # Variables para controlar el movimiento de "slide"
-        self.slide_dx = 0
-        self.slide_dy = 0
-        
-        self.setupTimer()
-
-    def initUI(self):
+
+        # Toda la lógica (estados, física, rebotes) vive en el motor; este
+        # widget solo traduce la entrada y dibuja el estado resultante
+        frame_counts = {state: len(frames) for state, frames in self.animations.items()}
+        self.engine = PetEngine(self.x(), self.y(), size=(self.width(), self.height()),
+                                frame_counts=frame_counts)
+        self.pending_inputs = []
+        self.reported_state = self.engine.pet.state
+        self.dragging = False
+        # Última posición pedida por el arrastre, aplicada una vez por tick
+        self.drag_target = None
+
+        # Sin interacción durante nap_after segundos el pingüino deja de
+        # animarse (y de despertar al planificador) hasta la siguiente entrada
+        self.nap_after = 120.0
+        self.last_activity = time.monotonic()
+        self.watching_expose = False
+
+        # Los rebotes usan los límites en caché de todos los monitores
+        self.screen_bounds = ScreenBounds.shared()
+        self.engine.bounds = self.screen_bounds.bounds
+        self.screen_bounds.changed.connect(self.onScreenBoundsChanged)
+
+        # Un único planificador (compartido entre pingüinos) hace avanzar el motor
+        self.scheduler = scheduler if scheduler is not None else PetScheduler.shared()
+        self.scheduler.add(self)
+        self.stats = self.scheduler.stats
+
+        # Superposición opcional con las métricas; se refresca dos veces por segundo
+        self.overlay_rect = QRect(0, 0, self.width(), 57)
+        self.overlay_timer = QTimer(self)
+        self.overlay_timer.timeout.connect(lambda: self.update(self.overlay_rect))
+
+        # Grabación opcional de la sesión (ver pettrace.py)
+        self.recorder = None
+        self.menu = None
+        # Modo autónomo opcional (ver behavior.py)
+        self.behavior = None
+
+    def initUI(self, position, size):
         # Fondo transparente y ventana sin bordes
         self.setWindowFlags(Qt.WindowStaysOnTopHint | Qt.FramelessWindowHint | Qt.Tool)
         self.setAttribute(Qt.WA_TranslucentBackground)
-        self.label = QLabel(self)
-        self.move(1600, 800)  # Posición inicial
+        self.move(*position)  # Posición inicial
 
         # Fijar un tamaño constante (por ejemplo, 200x200)
-        fixed_size = 200
-        self.setFixedSize(fixed_size, fixed_size)
-        self.label.setFixedSize(fixed_size, fixed_size)
-
-    def loadImage(self, path):
-        pix = QPixmap(path)
-        if pix.isNull():
-            print(f"[DEBUG] Error al cargar {path}")
-            return None
-        # Escalar todas las imágenes a un tamaño fijo (200x200 en este caso)
-        scaled_pix = pix.scaled(200, 200, Qt.KeepAspectRatio, Qt.SmoothTransformation)
-        return scaled_pix
+        self.setFixedSize(size, size)
 
     def loadAnimations(self):
-        self.animations = {}
-
-        # Animación idle: 4 sprites (ej. penguin_idle_01.png a penguin_idle_04.png)
-        idle_frames = []
-        for i in range(1, 5):
-            pix = self.loadImage(f"images/penguin_idle_{i:02d}.png")
-            if pix:
-                idle_frames.append(pix)
-        self.animations["idle"] = idle_frames if idle_frames else [self.loadImage("images/penguin_idle_01.png")]
-
-        # Animación de caminar: 8 frames
-        walk_frames = []
-        for i in range(1, 9):
-            pix = self.loadImage(f"images/penguin_walk_{i:02d}.png")
-            if pix:
-                walk_frames.append(pix)
-        self.animations["walk"] = walk_frames
-
-        # Animación de saltar: 3 frames
-        jump_frames = []
-        for i in range(1, 4):
-            pix = self.loadImage(f"images/penguin_jump_{i:02d}.png")
-            if pix:
-                jump_frames.append(pix)
-        self.animations["jump"] = jump_frames
-
-        # Animación de atacar: 3 frames
-        atack_frames = []
-        for i in range(1, 4):
-            pix = self.loadImage(f"images/penguin_atack_{i:02d}.png")
-            if pix:
-                atack_frames.append(pix)
-        self.animations["atack"] = atack_frames
-
-        # Animación de pre-slide: solo un fotograma (o podrías tener más)
-        preslide_frames = []
-        pix = self.loadImage("images/penguin_preslide_01.png")
-        if pix:
-            preslide_frames.append(pix)
-        self.animations["pre_slide"] = preslide_frames
-
-        # Animación de slide: los fotogramas continuos de deslizamiento (diagonales)
-        slide_frames = []
-        for i in range(1, 4):
-            pix = self.loadImage(f"images/penguin_slide_{i:02d}.png")
-            if pix:
-                slide_frames.append(pix)
-        self.animations["slide"] = slide_frames
-
-        # Estado inicial: idle
-        self.current_frames = self.animations["idle"]
-        self.current_frame_index = 0
-        if self.current_frames:
-            self.label.setPixmap(self.current_frames[self.current_frame_index])
-            print("[DEBUG] Animación inicial 'idle' cargada")
-
-    def setupTimer(self):
-        self.timer = QTimer(self)
-        self.timer.timeout.connect(self.updateAnimation)
-        self.timer.start(200)  # Actualiza cada 120 ms
-        print("[DEBUG] Timer iniciado: actualización cada 120ms")
-
-    def updateAnimation(self):
-        self.setFocus()  # Mantener el foco
-
-        if not self.current_frames:
-            return
-
-        # Actualizar el índice de fotograma
-        self.current_frame_index = (self.current_frame_index + 1) % len(self.current_frames)
-        current_pix = self.current_frames[self.current_frame_index]
-
-        # Reflejar la imagen si el pingüino mira a la izquierda
-        if self.facing == "left":
-            current_pix = current_pix.transformed(QTransform().scale(-1, 1))
-
-        self.label.setPixmap(current_pix)
-
-        # Debug de la animación y posición
-        # print(f"[DEBUG] Estado: {self.current_state}, Frame: {self.current_frame_index}, Posición: ({self.x()}, {self.y()})")
-
-        # Si estamos en pre_slide y llegamos al final, pasamos a slide
-        if self.current_state == "pre_slide" and self.current_frame_index == len(self.current_frames) - 1:
-            self.setState("slide")
-        
-        # Movimiento en estado "walk"
-        if self.current_state == "walk":
-            if self.facing == "right":
-                self.move(self.x() + self.speed, self.y())
-            elif self.facing == "left":
-                self.move(self.x() - self.speed, self.y())
-
-        # Simulación simple de salto: sube en el primer frame y baja en el último
-        if self.current_state == "jump":
-            if self.current_frame_index == 0:
-                self.move(self.x(), self.y() - self.speed)
-            elif self.current_frame_index == len(self.current_frames) - 1:
-                self.move(self.x(), self.y() + self.speed)
-            if self.current_frame_index == len(self.current_frames) - 1:
-                self.setState("idle")
-
-        # Movimiento en estado "slide"
-        if self.current_state == "slide":
-            # Obtener dimensiones de la pantalla
-            desktop = QDesktopWidget()
-            screen_rect = desktop.screenGeometry()
-            screen_width = screen_rect.width()
-            screen_height = screen_rect.height()
-
-            # Calcular nueva posición
-            new_x = self.x() + self.slide_dx
-            new_y = self.y() + self.slide_dy
-
-            # Colisión lateral: al chocar con las "murallas" horizontales,
-            # se invierte dx y se actualiza la orientación
-            if new_x < 0:
-                new_x = 0
-                self.slide_dx = -self.slide_dx
-                self.facing = "right"
-                print("[DEBUG] Rebote en pared izquierda, cambiando orientación a 'right'")
-            elif new_x + self.width() > screen_width:
-                new_x = screen_width - self.width()
-                self.slide_dx = -self.slide_dx
-                self.facing = "left"
-                print("[DEBUG] Rebote en pared derecha, cambiando orientación a 'left'")
-
-            # Colisión vertical: simplemente se invierte dy (no afecta la orientación)
-            if new_y < 0:
-                new_y = 0
-                self.slide_dy = -self.slide_dy
-                print("[DEBUG] Rebote en el techo")
-            elif new_y + self.height() > screen_height:
-                new_y = screen_height - self.height()
-                self.slide_dy = -self.slide_dy
-                print("[DEBUG] Rebote en el suelo")
-
-            self.move(new_x, new_y)
-
-        # Al finalizar la animación de "atack", volver a idle
-        if self.current_state == "atack":
-            if self.current_frame_index == len(self.current_frames) - 1:
-                self.setState("idle")
+        # Los fotogramas se comparten entre todos los pingüinos del mismo tamaño:
+        # solo el primero los decodifica y escala. Solo idle está garantizada
+        # aquí; el resto llega después (mientras tanto se muestra idle).
+        self.sprites = sprites.acquire(self.width())
+        self.animations = self.sprites.animations
+        self.sprite_cache = self.sprites.frames
+        self.sprites.animationLoaded.connect(self.onAnimationLoaded)
+
+        # Estado inicial: la primera animación, mirando a la derecha
+        self.displayed_key = None
+        self.current_frame = None
+        first = sprites.FIRST_ANIMATION
+        if self.animations[first]:
+            self.current_frame = self.animations[first][0]
+            self.displayed_key = (self.sprites.table.ids[first], RIGHT, 0)
+            self.setMask(self.current_frame.mask)
+            log.debug("Animación inicial '%s' cargada", first)
+
+    def onAnimationLoaded(self, state):
+        self.engine.set_frame_count(state, len(self.animations[state]))
+        if self.engine.state_name == state:
+            self.scheduler.wake()
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        if self.first_frame_ms is None:
+            # Se mide cuando el bucle de eventos ya pintó la ventana
+            QTimer.singleShot(0, self.reportFirstFrame)
+        # La ventana avisa al dejar de estar tapada/minimizada
+        if not self.watching_expose and self.windowHandle() is not None:
+            self.windowHandle().installEventFilter(self)
+            self.watching_expose = True
+        self.setFocus()
+        self.wake()
+
+    def eventFilter(self, watched, event):
+        if event.type() == QEvent.Expose and watched.isExposed():
+            self.scheduler.wake()
+        return False
+
+    def wake(self):
+        # Hubo actividad: volver a animar a ritmo completo
+        self.last_activity = time.monotonic()
+        self.scheduler.wake()
+
+    def isPaused(self):
+        # Oculto, minimizado o sin ninguna parte visible: no hace falta animar
+        handle = self.windowHandle()
+        return (not self.isVisible() or self.isMinimized()
+                or (handle is not None and not handle.isExposed()))
+
+    def nextWakeup(self):
+        # 0: necesita el ritmo completo; None: nada que animar (durmiendo);
+        # si no, segundos hasta su siguiente cambio de fotograma
+        if (self.engine.pet.state != self.engine.IDLE or self.pending_inputs or self.dragging
+                or self.overlay_timer.isActive()):
+            return 0.0
+        if time.monotonic() - self.last_activity > self.nap_after:
+            return None
+        return self.engine.time_to_next_frame()
+
+    def reportFirstFrame(self):
+        self.first_frame_ms = (time.perf_counter() - self.created_at) * 1000
+        log.debug("Primer fotograma en %.1fms", self.first_frame_ms)
+
+    def showFrame(self):
+        # Solo se repinta cuando cambia el fotograma u orientación, y solo la
+        # zona que ocupaban el fotograma anterior y el nuevo
+        pet = self.engine.pet
+        if pet.state != self.reported_state:
+            self.reported_state = pet.state
+            self.stateChanged.emit(self.engine.state_name)
+        key = (pet.anim, pet.facing, pet.frame_index)
+        if key != self.displayed_key:
+            self.displayed_key = key
+            frame = self.sprite_cache[(self.engine.table.names[pet.anim],
+                                       FACING_NAMES[pet.facing], pet.frame_index)]
+            if self.current_frame is not None:
+                self.update(self.current_frame.rect.united(frame.rect))
+            else:
+                self.update(frame.rect)
+            self.current_frame = frame
+            self.applyMask()
+
+    def applyMask(self):
+        # Solo los píxeles visibles reciben el ratón. La máscara sale de las
+        # bandas ya calculadas del fotograma (la primera vez que se muestra;
+        # luego queda guardada), así que aquí no se mira ningún píxel
+        started = time.perf_counter()
+        mask = self.current_frame.mask
+        if self.overlay_timer.isActive():
+            mask = mask.united(QRegion(self.overlay_rect))
+        self.setMask(mask)
+        self.stats.add_call("setMask", time.perf_counter() - started)
+
+    def paintEvent(self, event):
+        # La región pendiente ya llega limpia (fondo translúcido); basta con
+        # dibujar el fotograma recortado en su posición
+        started = time.perf_counter()
+        painter = QPainter(self)
+        if self.current_frame is not None:
+            painter.drawPixmap(self.current_frame.rect.topLeft(), self.current_frame.pixmap)
+        if self.overlay_timer.isActive():
+            self.paintOverlay(painter)
+        painter.end()
+        self.stats.add_call("paintEvent", time.perf_counter() - started)
+
+    def paintOverlay(self, painter):
+        painter.fillRect(self.overlay_rect, QColor(0, 0, 0, 160))
+        painter.setPen(Qt.white)
+        painter.setFont(QFont("monospace", 7))
+        import resources
+        for i, line in enumerate(self.stats.overlay_lines() + [resources.overlay_line()]):
+            painter.drawText(4, 12 + i * 13, line)
+
+    def toggleOverlay(self):
+        if self.overlay_timer.isActive():
+            self.overlay_timer.stop()
+        else:
+            self.overlay_timer.start(500)
+        if self.current_frame is not None:
+            self.applyMask()
+        self.update(self.overlay_rect)
+        self.wake()
+
+    def updateAnimation(self, steps=1, alpha=0.0):
+        # Avanza `steps` pasos fijos de física y dibuja en la posición
+        # interpolada `alpha` entre los dos últimos. El planificador llama a
+        # las dos mitades por separado para resolver antes las colisiones
+        self.stepAnimation(steps)
+        self.drawAnimation(alpha)
+
+    def stepAnimation(self, steps):
+        dt = self.scheduler.physics_dt
+        if steps:
+            self.stats.add_state_time(self.engine.state_name, steps * dt)
+        for _ in range(steps):
+            inputs = ()
+            if self.pending_inputs:
+                inputs, self.pending_inputs = self.pending_inputs, []
+            self.engine.step(dt, inputs)
+
+        # Los eventos del ratón se acumulan: solo cuenta la última posición
+        if self.drag_target is not None:
+            self.engine.move_to(*self.drag_target)
+            self.drag_target = None
+
+    def drawAnimation(self, alpha):
+        x, y = self.engine.interpolated(alpha)
+        x = round(x)
+        y = round(y)
+        if x != self.x() or y != self.y():
+            started = time.perf_counter()
+            self.move(x, y)
+            self.stats.add_call("move", time.perf_counter() - started)
+        self.showFrame()
+
+    def onScreenBoundsChanged(self, bounds):
+        self.engine.bounds = bounds
 
     def setState(self, state):
-        print(f"[DEBUG] Cambio de estado: {self.current_state} -> {state}")
-        self.current_state = state
-        
-        if state == "pre_slide":
-            # En pre_slide, solo se usa el fotograma de pre-slide (sin movimiento)
-            self.current_frames = self.animations["pre_slide"]
-            self.current_frame_index = 0
-            # No generamos dx, dy aún; se hará al pasar a "slide"
-
-        # Si es slide, generar dirección aleatoria
-        elif state == "slide":
-            # Elegir uno de los 4 ángulos diagonales (en grados)
-            angulo_grados = random.choice([45, 135, 225, 315])
-            angulo = math.radians(angulo_grados)
-            slide_speed = 50  # Velocidad de deslizamiento
-
-            # Calcula dx y dy de forma que sean iguales en valor absoluto
-            self.slide_dx = int(slide_speed * math.cos(angulo))
-            self.slide_dy = int(slide_speed * math.sin(angulo))
-            
-            # Establecer la orientación del pingüino según el signo de dx
-            self.facing = "right" if self.slide_dx > 0 else "left"
-            print(f"[DEBUG] Slide: ángulo {angulo_grados}°, dx={self.slide_dx}, dy={self.slide_dy}")
-            
+        started = time.perf_counter()
+        self.engine.set_state(state)
+        self.showFrame()
+        self.stats.add_call("setState", time.perf_counter() - started)
+        self.wake()
+        log.debug("Animación '%s' iniciada", state)
+
+    def onNewMessages(self, count):
+        # Avisos de notifier.py: el pingüino "ataca" si estaba quieto
+        log.info("%d mensajes nuevos en Rocket.Chat", count)
+        if self.engine.pet.state == self.engine.IDLE and not self.dragging:
+            self.setState("atack")
+
+    def onUnreadChanged(self, total, channels):
+        if total:
+            names = ", ".join(f"{c['nombre']} ({c['mensajes_pendientes']})" for c in channels)
+            self.setToolTip(f"{total} mensajes sin leer: {names}")
         else:
-            # Reset por si acaso
-            self.slide_dx = 0
-            self.slide_dy = 0
+            self.setToolTip("")
 
-        if state in self.animations and self.animations[state]:
-            self.current_frames = self.animations[state]
+    def onPluginFinished(self, name, ok, value):
+        # Resultados de plugins.PluginRuntime: salta si la tarea salió bien
+        if ok:
+            log.info("Plugin '%s': %s", name, value)
+            if self.engine.pet.state == self.engine.IDLE and not self.dragging:
+                self.setState("jump")
         else:
-            self.current_frames = self.animations["idle"]
-
-        self.current_frame_index = 0
-        current_pix = self.current_frames[self.current_frame_index]
-        if self.facing == "left":
-            current_pix = current_pix.transformed(QTransform().scale(-1, 1))
-        self.label.setPixmap(current_pix)
-        print(f"[DEBUG] Animación '{state}' iniciada")
+            log.warning("Plugin '%s' sin resultado: %s", name, value)
+
+    def startRecording(self, path=None):
+        # pettrace y resources se importan al usarse: no hacen falta para el
+        # primer fotograma
+        from pettrace import TraceRecorder
+        self.recorder = TraceRecorder(self.engine, path).start()
+        log.info("Grabando traza en %s", self.recorder.path)
+
+    def stopRecording(self):
+        path = self.recorder.stop()
+        log.info("Traza de %d pasos guardada en %s", self.recorder.steps, path)
+        self.recorder = None
+        return path
+
+    def setAutonomous(self, enabled):
+        if enabled and self.behavior is None:
+            from behavior import BehaviorPlanner
+            self.behavior = BehaviorPlanner(self)
+            log.info("Modo autónomo activado")
+        elif not enabled and self.behavior is not None:
+            self.behavior.stop()
+            self.behavior.deleteLater()
+            self.behavior = None
+            log.info("Modo autónomo desactivado")
+
+    def moveTo(self, x, y):
+        # Reubica la simulación (p. ej. al arrastrar) sin interpolar
+        self.engine.move_to(x, y)
+        self.move(x, y)
 
     def keyPressEvent(self, event):
-        if event.key() == Qt.Key_Right:
-            if event.isAutoRepeat():
-                return
-            self.moving_right = True
-            self.facing = "right"
-            if self.current_state not in ["walk", "jump", "slide", "pre_slide"]:
-                self.setState("walk")
-            print("[DEBUG] Tecla derecha presionada")
-        elif event.key() == Qt.Key_Left:
-            if event.isAutoRepeat():
-                return
-            self.moving_left = True
-            self.facing = "left"
-            if self.current_state not in ["walk", "jump", "slide", "pre_slide"]:
-                self.setState("walk")
-            print("[DEBUG] Tecla izquierda presionada")
-        elif event.key() == Qt.Key_Up:
-            if not event.isAutoRepeat() and self.current_state != "jump":
-                self.setState("jump")
-                print("[DEBUG] Tecla arriba presionada: salto")
-        elif event.key() == Qt.Key_Down:
-            if not event.isAutoRepeat() and self.current_state not in ["pre_slide", "slide"]:
-                # Al presionar la tecla, iniciamos pre_slide
-                self.setState("pre_slide")
-                print("[DEBUG] Tecla abajo presionada: pre-slide")
-        elif event.key() == Qt.Key_A:
-            if not event.isAutoRepeat() and self.current_state != "atack":
-                self.setState("atack")
-                print("[DEBUG] Tecla A presionada: ataque")
-        else:
+        key = KEY_MAP.get(event.key())
+        if key is None:
             super().keyPressEvent(event)
-
+            return
+        if event.isAutoRepeat():
+            return
+        # Antes de la tecla: el modo autónomo suelta las suyas
+        self.userActivity.emit()
+        # La tecla se aplica en el siguiente paso de física
+        self.pending_inputs.append((key, True))
+        self.wake()
+        log.debug("Tecla %s presionada", KEY_NAMES[key])
 
     def keyReleaseEvent(self, event):
         # Ignorar eventos de auto repetición en la liberación
         if event.isAutoRepeat():
             return
 
-        if event.key() == Qt.Key_Right:
-            self.moving_right = False
-            print("[DEBUG] Tecla derecha liberada")
-        elif event.key() == Qt.Key_Left:
-            self.moving_left = False
-            print("[DEBUG] Tecla izquierda liberada")
-        elif event.key() == Qt.Key_Down:
-            if self.current_state in ["pre_slide", "slide"]:
-                self.setState("idle")
-                print("[DEBUG] Tecla abajo liberada: fin slide")
-        # Solo si ninguna tecla lateral está presionada, se cambia a idle (para walk)
-        if not (self.moving_right or self.moving_left) and self.current_state == "walk":
-            self.setState("idle")
-            print("[DEBUG] No se mantienen teclas laterales: volver a idle")
-        else:
+        key = KEY_MAP.get(event.key())
+        if key is None:
             super().keyReleaseEvent(event)
+            return
+        self.pending_inputs.append((key, False))
+        self.wake()
+        log.debug("Tecla %s liberada", KEY_NAMES[key])
 
     # Métodos para permitir arrastrar la ventana con el mouse
     def mousePressEvent(self, event):
+        self.setFocus()
+        self.userActivity.emit()
         if event.button() == Qt.LeftButton:
             self.drag_position = event.globalPos() - self.frameGeometry().topLeft()
+            self.dragging = True
+            self.engine.set_held(True)
+            self.wake()
             event.accept()
         else:
             super().mousePressEvent(event)
 
     def mouseMoveEvent(self, event):
-        if event.buttons() & Qt.LeftButton:
-            self.move(event.globalPos() - self.drag_position)
+        if event.buttons() & Qt.LeftButton and self.dragging:
+            # No se mueve la ventana aquí: el siguiente tick aplica solo la
+            # posición más reciente (como mucho un move() por fotograma)
+            target = event.globalPos() - self.drag_position
+            self.drag_target = (target.x(), target.y())
+            self.wake()
+            event.accept()
+        else:
+            super().mouseMoveEvent(event)
+
+    def mouseReleaseEvent(self, event):
+        if event.button() == Qt.LeftButton and self.dragging:
+            self.dragging = False
+            self.engine.set_held(False)
+            # Soltar en la última posición sin esperar al siguiente tick
+            if self.drag_target is not None:
+                self.moveTo(*self.drag_target)
+                self.drag_target = None
             event.accept()
         else:
-            super().mouseMoveEvent(event)        
+            super().mouseReleaseEvent(event)
 
     def closeEvent(self, event):
-        print("[DEBUG] Cerrando el programa")
-        QApplication.instance().quit()
+        self.scheduler.remove(self)
+        self.setAutonomous(False)
+        if self.recorder is not None:
+            self.stopRecording()
+        if self.sprites is not None:
+            sprites.release(self.sprites)
+            self.sprites = None
+        self.closed.emit()
+        # Al cerrar el último pingüino se termina el programa
+        if not self.scheduler.pets:
+            log.debug("Cerrando el programa")
+            QApplication.instance().quit()
+
+    def buildContextMenu(self):
+        # El menú se crea una sola vez y se reutiliza: crear un QMenu(self)
+        # en cada clic dejaba un objeto hijo más del pingüino por clic
+        self.menu = QMenu(self)
+        self.saludar_action = self.menu.addAction("Saludar")
+        self.registro_action = self.menu.addAction("Volcar registro")
+        self.overlay_action = self.menu.addAction("Mostrar rendimiento")
+        self.overlay_action.setCheckable(True)
+        self.stats_action = self.menu.addAction("Exportar rendimiento (JSON)")
+        self.trace_action = self.menu.addAction("Grabar traza")
+        self.trace_action.setCheckable(True)
+        self.auto_action = self.menu.addAction("Modo autónomo")
+        self.auto_action.setCheckable(True)
+        self.cerrar_action = self.menu.addAction("Cerrar")
 
     def contextMenuEvent(self, event):
-        menu = QMenu(self)
-        saludar_action = menu.addAction("Saludar")
-        cerrar_action = menu.addAction("Cerrar")
-        action = menu.exec_(event.globalPos())
-        if action == saludar_action:
+        if self.menu is None:
+            self.buildContextMenu()
+        self.overlay_action.setChecked(self.overlay_timer.isActive())
+        self.trace_action.setChecked(self.recorder is not None)
+        self.auto_action.setChecked(self.behavior is not None)
+        self.userActivity.emit()
+        action = self.menu.exec_(event.globalPos())
+        self.setFocus()
+        if action == self.saludar_action:
             print("¡Hola! Saludo desde el menú contextual.")
-        elif action == cerrar_action:
-            self.close() # Cierra la ventana
\ No newline at end of file
+        elif action == self.registro_action:
+            path = petlog.dump()
+            QMessageBox.information(self, "Registro", f"Registro guardado en:\n{path}")
+        elif action == self.overlay_action:
+            self.toggleOverlay()
+        elif action == self.stats_action:
+            import resources
+            path = self.stats.export(extra={"resources": resources.snapshot(full=True)})
+            QMessageBox.information(self, "Rendimiento", f"Métricas guardadas en:\n{path}")
+        elif action == self.trace_action:
+            if self.recorder is None:
+                self.startRecording()
+            else:
+                path = self.stopRecording()
+                QMessageBox.information(self, "Traza", f"Traza guardada en:\n{path}")
+        elif action == self.auto_action:
+            self.setAutonomous(self.behavior is None)
+        elif action == self.cerrar_action:
+            self.close() # Cierra la ventana
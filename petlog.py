@@ -0,0 +1,68 @@
+import os
+import sys
+import time
+import logging
+import tempfile
+import collections
+
+# Registro del pingüino. Los mensajes usan el formato perezoso de logging
+# (log.debug("x=%s", x)): si el nivel DEBUG está desactivado, la llamada
+# termina en la comprobación de nivel, sin formatear texto ni escribir nada.
+# Con DEBUG activo los registros se guardan sin formatear en un búfer
+# circular en memoria, que solo se formatea al volcarlo.
+
+log = logging.getLogger("penguin")
+log.propagate = False
+
+FORMAT = "%(asctime)s.%(msecs)03d %(levelname)s %(message)s"
+DATE_FORMAT = "%H:%M:%S"
+
+
+class RingBufferHandler(logging.Handler):
+    def __init__(self, capacity=5000):
+        super().__init__()
+        self.records = collections.deque(maxlen=capacity)
+        self.setFormatter(logging.Formatter(FORMAT, DATE_FORMAT))
+
+    def emit(self, record):
+        self.records.append(record)
+
+    def lines(self):
+        return [self.format(record) for record in list(self.records)]
+
+
+buffer = RingBufferHandler()
+log.addHandler(buffer)
+log.setLevel(logging.WARNING)
+_console = None
+
+
+def configure(debug=False, console=False, capacity=None):
+    # debug: guardar también los mensajes DEBUG en el búfer.
+    # console: además escribirlos en stderr (solo para desarrollo).
+    global _console
+    if capacity is not None and capacity != buffer.records.maxlen:
+        buffer.records = collections.deque(buffer.records, maxlen=capacity)
+    log.setLevel(logging.DEBUG if debug else logging.WARNING)
+    if console and _console is None:
+        _console = logging.StreamHandler(sys.stderr)
+        _console.setFormatter(logging.Formatter(FORMAT, DATE_FORMAT))
+        log.addHandler(_console)
+    elif not console and _console is not None:
+        log.removeHandler(_console)
+        _console = None
+
+
+def debug_enabled():
+    return log.isEnabledFor(logging.DEBUG)
+
+
+def dump(path=None):
+    # Vuelca el búfer a un archivo de texto y devuelve su ruta
+    if path is None:
+        name = time.strftime("penguin-log-%Y%m%d-%H%M%S.txt")
+        path = os.path.join(tempfile.gettempdir(), name)
+    with open(path, "w", encoding="utf-8") as f:
+        for line in buffer.lines():
+            f.write(line + "\n")
+    return path
@@ -0,0 +1,280 @@
+import os
+import sys
+import time
+import zlib
+import random
+import struct
+import argparse
+import tempfile
+
+# Grabación y reproducción de trazas del motor, para reproducir problemas de
+# rendimiento y usar sesiones reales como pruebas de regresión.
+#
+# Formato binario (little endian): cabecera y después registros de una letra
+# seguida de su carga útil, en el orden en que ocurrieron.
+#   cabecera  "PGTR", versión, semilla del RNG, crc32 de los nombres de animación
+#   P  estado completo del pingüino al empezar a grabar (+ tamaño)
+#   S  un paso de física: dt, teclas aplicadas, estado resultante y su duración
+#   A  set_state desde fuera del motor     M  move_to (arrastre)
+#   H  agarrado/soltado                    F  animación cargada (fotogramas)
+#   B  cambio de límites de pantalla      N  empujón de otro pingüino
+#   V  rebote contra otro pingüino (velocidad del slide)
+
+TRACE_VERSION = 2
+# La versión 1 no tenía N ni V; se sigue pudiendo reproducir
+READABLE_VERSIONS = (1, 2)
+HEADER = struct.Struct("<4sHQI")
+SNAPSHOT = struct.Struct("<BBbH9d3?HH")
+STEP_HEAD = struct.Struct("<dB")
+STEP_INPUT = struct.Struct("<BB")
+STEP_TAIL = struct.Struct("<BBbHddf")
+SET_STATE = struct.Struct("<B")
+MOVE = struct.Struct("<dd")
+HELD = struct.Struct("<?")
+FRAME_COUNT = struct.Struct("<BH")
+BOUNDS = struct.Struct("<4d")
+NUDGE = struct.Struct("<dd")
+VELOCITY = struct.Struct("<dd")
+
+SNAPSHOT_FIELDS = (
+    "state", "anim", "facing", "frame_index",
+    "frame_elapsed", "x", "y", "prev_x", "prev_y", "jump_elapsed", "jump_base_y",
+    "slide_dx", "slide_dy", "moving_right", "moving_left", "held",
+)
+
+
+def names_checksum(table):
+    return zlib.crc32("\0".join(table.names).encode("utf-8"))
+
+
+class TraceRecorder:
+    # Sustituye (solo en esta instancia) los métodos del motor que cambian su
+    # estado por versiones que además escriben la traza; al parar se quitan,
+    # así que sin grabar no hay ningún coste.
+
+    WRAPPED = ("step", "set_state", "move_to", "nudge", "set_slide_velocity", "set_held",
+               "set_frame_count")
+
+    def __init__(self, engine, path=None):
+        if path is None:
+            name = time.strftime("penguin-trace-%Y%m%d-%H%M%S.trace")
+            path = os.path.join(tempfile.gettempdir(), name)
+        self.engine = engine
+        self.path = path
+        self.file = None
+        self.stepping = False
+        self.bounds = None
+        self.steps = 0
+
+    def start(self):
+        engine = self.engine
+        # Semilla nueva y conocida: desde aquí el RNG es reproducible
+        seed = random.SystemRandom().getrandbits(63)
+        engine.rng.seed(seed)
+        self.file = open(self.path, "wb")
+        self.file.write(HEADER.pack(b"PGTR", TRACE_VERSION, seed, names_checksum(engine.table)))
+        pet = engine.pet
+        self.file.write(b"P" + SNAPSHOT.pack(*(getattr(pet, field) for field in SNAPSHOT_FIELDS),
+                                             engine.width, engine.height))
+        for anim, count in enumerate(engine.frame_counts):
+            self.file.write(b"F" + FRAME_COUNT.pack(anim, count))
+        self.write_bounds()
+
+        self.originals = {name: getattr(engine, name) for name in self.WRAPPED}
+        engine.step = self.step
+        engine.set_state = self.set_state
+        engine.move_to = self.move_to
+        engine.nudge = self.nudge
+        engine.set_slide_velocity = self.set_slide_velocity
+        engine.set_held = self.set_held
+        engine.set_frame_count = self.set_frame_count
+        return self
+
+    def stop(self):
+        for name in self.WRAPPED:
+            delattr(self.engine, name)
+        self.file.close()
+        self.file = None
+        return self.path
+
+    def write_bounds(self):
+        self.bounds = self.engine.bounds
+        self.file.write(b"B" + BOUNDS.pack(*self.bounds))
+
+    def step(self, dt, inputs=()):
+        if self.engine.bounds is not self.bounds:
+            self.write_bounds()
+        inputs = tuple(inputs)
+        self.stepping = True
+        started = time.perf_counter()
+        self.originals["step"](dt, inputs)
+        duration = time.perf_counter() - started
+        self.stepping = False
+        pet = self.engine.pet
+        self.file.write(b"S" + STEP_HEAD.pack(dt, len(inputs))
+                        + b"".join(STEP_INPUT.pack(key, pressed) for key, pressed in inputs)
+                        + STEP_TAIL.pack(pet.state, pet.anim, pet.facing, pet.frame_index,
+                                         pet.x, pet.y, duration))
+        self.steps += 1
+
+    # Las llamadas que hace el propio motor durante un paso no se graban: la
+    # reproducción las repite al repetir el paso
+
+    def set_state(self, state):
+        self.originals["set_state"](state)
+        if not self.stepping:
+            self.file.write(b"A" + SET_STATE.pack(self.engine.pet.state))
+
+    def move_to(self, x, y):
+        self.originals["move_to"](x, y)
+        self.file.write(b"M" + MOVE.pack(x, y))
+
+    def nudge(self, dx, dy):
+        self.originals["nudge"](dx, dy)
+        self.file.write(b"N" + NUDGE.pack(dx, dy))
+
+    def set_slide_velocity(self, dx, dy):
+        self.originals["set_slide_velocity"](dx, dy)
+        self.file.write(b"V" + VELOCITY.pack(dx, dy))
+
+    def set_held(self, held):
+        self.originals["set_held"](held)
+        self.file.write(b"H" + HELD.pack(held))
+
+    def set_frame_count(self, anim, count):
+        self.originals["set_frame_count"](anim, count)
+        self.file.write(b"F" + FRAME_COUNT.pack(self.engine.state_id(anim), count))
+
+
+def read_records(path):
+    # Genera (tipo, valores) por cada registro de la traza
+    with open(path, "rb") as f:
+        data = f.read()
+    magic, version, seed, checksum = HEADER.unpack_from(data, 0)
+    if magic != b"PGTR" or version not in READABLE_VERSIONS:
+        raise ValueError(f"{path} no es una traza compatible")
+    yield "header", (seed, checksum)
+    offset = HEADER.size
+    simple = {b"A": SET_STATE, b"M": MOVE, b"H": HELD, b"F": FRAME_COUNT,
+              b"B": BOUNDS, b"P": SNAPSHOT, b"N": NUDGE, b"V": VELOCITY}
+    while offset < len(data):
+        kind = data[offset:offset + 1]
+        offset += 1
+        if kind == b"S":
+            dt, count = STEP_HEAD.unpack_from(data, offset)
+            offset += STEP_HEAD.size
+            inputs = [STEP_INPUT.unpack_from(data, offset + i * STEP_INPUT.size)
+                      for i in range(count)]
+            offset += count * STEP_INPUT.size
+            tail = STEP_TAIL.unpack_from(data, offset)
+            offset += STEP_TAIL.size
+            yield "S", (dt, inputs, tail)
+        elif kind in simple:
+            values = simple[kind].unpack_from(data, offset)
+            offset += simple[kind].size
+            yield kind.decode(), values
+        else:
+            raise ValueError(f"registro desconocido {kind!r} en el byte {offset - 1}")
+
+
+def replay(path, max_divergences=10):
+    # Repite la traza sin Qt y a toda velocidad; devuelve un informe con las
+    # divergencias de estado y la comparación de tiempos por paso
+    from engine import PetEngine, PetState
+    from animations import load_manifest
+
+    table = load_manifest()
+    records = list(read_records(path))
+    seed, checksum = records[0][1]
+    if checksum != names_checksum(table):
+        raise ValueError("la traza se grabó con otras animaciones (animations.json)")
+
+    engine = None
+    divergences = []
+    recorded_times = []
+    replay_times = []
+    steps = 0
+    for kind, values in records[1:]:
+        if kind == "S":
+            dt, inputs, expected = values
+            started = time.perf_counter()
+            engine.step(dt, inputs)
+            replay_times.append(time.perf_counter() - started)
+            recorded_times.append(expected[-1])
+            pet = engine.pet
+            actual = (pet.state, pet.anim, pet.facing, pet.frame_index, pet.x, pet.y)
+            if actual != tuple(expected[:-1]) and len(divergences) < max_divergences:
+                divergences.append((steps, tuple(expected[:-1]), actual))
+            steps += 1
+        elif kind == "P":
+            *fields, width, height = values
+            engine = PetEngine(size=(width, height), table=table, rng=random.Random(seed))
+            engine.pet = PetState()
+            for field, value in zip(SNAPSHOT_FIELDS, fields):
+                setattr(engine.pet, field, value)
+        elif kind == "F":
+            engine.set_frame_count(*values)
+        elif kind == "B":
+            engine.bounds = values
+        elif kind == "A":
+            engine.set_state(values[0])
+        elif kind == "M":
+            engine.move_to(*values)
+        elif kind == "N":
+            engine.nudge(*values)
+        elif kind == "V":
+            engine.set_slide_velocity(*values)
+        elif kind == "H":
+            engine.set_held(values[0])
+
+    def stats(times):
+        ordered = sorted(times)
+        if not ordered:
+            return {"total_ms": 0.0, "mean_us": 0.0, "p95_us": 0.0}
+        return {
+            "total_ms": sum(ordered) * 1000,
+            "mean_us": sum(ordered) / len(ordered) * 1e6,
+            "p95_us": ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))] * 1e6,
+        }
+
+    return {
+        "steps": steps,
+        "divergences": divergences,
+        "recorded": stats(recorded_times),
+        "replay": stats(replay_times),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Trazas del pingüino")
+    parser.add_argument("command", choices=("replay", "info"))
+    parser.add_argument("path")
+    args = parser.parse_args()
+
+    if args.command == "info":
+        counts = {}
+        for kind, _ in read_records(args.path):
+            counts[kind] = counts.get(kind, 0) + 1
+        print(f"{args.path}: {os.path.getsize(args.path)} bytes")
+        for kind, count in sorted(counts.items()):
+            print(f"  {kind:<6} {count}")
+        return 0
+
+    report = replay(args.path)
+    recorded, replayed = report["recorded"], report["replay"]
+    print(f"{report['steps']} pasos reproducidos")
+    print(f"  grabado:    {recorded['total_ms']:9.2f} ms  media {recorded['mean_us']:.2f} us"
+          f"  p95 {recorded['p95_us']:.2f} us")
+    print(f"  reproducido:{replayed['total_ms']:9.2f} ms  media {replayed['mean_us']:.2f} us"
+          f"  p95 {replayed['p95_us']:.2f} us")
+    for step, expected, actual in report["divergences"]:
+        print(f"  divergencia en el paso {step}: esperado {expected}, obtenido {actual}")
+    if report["divergences"]:
+        print("La reproducción NO coincide con la traza")
+        return 1
+    print("La reproducción coincide con la traza")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
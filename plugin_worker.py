@@ -0,0 +1,23 @@
+import importlib
+import traceback
+
+# Punto de entrada de los procesos de plugins. Va en un módulo aparte, sin
+# Qt, para que cada proceso hijo solo importe el plugin que ejecuta.
+
+
+def resolve(target):
+    # "modulo:funcion" -> función
+    module_name, _, function_name = target.partition(":")
+    return getattr(importlib.import_module(module_name), function_name)
+
+
+def run_plugin(target, kwargs, conn):
+    # Se ejecuta en el proceso hijo; el resultado viaja por la tubería propia
+    # de esta ejecución, así que matar un hijo no afecta a los demás
+    try:
+        result = resolve(target)(**kwargs)
+        conn.send(("ok", result))
+    except BaseException:
+        conn.send(("error", traceback.format_exc()))
+    finally:
+        conn.close()
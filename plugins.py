@@ -0,0 +1,150 @@
+import json
+import time
+import collections
+import multiprocessing
+
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+
+from petlog import log
+from plugin_worker import run_plugin
+
+# Integraciones pesadas (Selenium, HTTP bloqueante...) como tareas en procesos
+# aparte. Cada ejecución tiene su propio proceso, con un máximo de
+# `max_workers` a la vez: si un plugin se cuelga se mata al pasar su timeout,
+# si falla o se cae no afecta al pingüino, y su memoria se libera al terminar.
+
+
+class PluginJob:
+    __slots__ = ("name", "target", "kwargs", "interval", "timeout", "timer")
+
+    def __init__(self, name, target, kwargs=None, interval=None, timeout=60.0):
+        self.name = name
+        self.target = target  # "modulo:funcion"
+        self.kwargs = kwargs or {}
+        self.interval = interval  # segundos entre ejecuciones, None = solo a mano
+        self.timeout = timeout
+        self.timer = None
+
+
+class PluginRun:
+    __slots__ = ("job", "process", "conn", "started", "result")
+
+    def __init__(self, job, process, conn):
+        self.job = job
+        self.process = process
+        self.conn = conn
+        self.started = time.monotonic()
+        self.result = None
+
+
+class PluginRuntime(QObject):
+    # finished(nombre, ok, valor): valor es lo que devolvió el plugin, o el
+    # motivo del fallo (traceback, "timeout", "cancelado", código de salida)
+    finished = pyqtSignal(str, bool, object)
+
+    def __init__(self, max_workers=2, poll_ms=100, parent=None):
+        super().__init__(parent)
+        # spawn: el hijo no hereda el estado de Qt del proceso principal
+        self.context = multiprocessing.get_context("spawn")
+        self.max_workers = max_workers
+        self.jobs = {}
+        self.running = {}
+        self.queued = collections.deque()
+        # Solo se sondea mientras hay procesos en marcha
+        self.poll_timer = QTimer(self)
+        self.poll_timer.setInterval(poll_ms)
+        self.poll_timer.timeout.connect(self.poll)
+
+    def add_job(self, job):
+        self.jobs[job.name] = job
+        if job.interval:
+            job.timer = QTimer(self)
+            job.timer.setInterval(round(job.interval * 1000))
+            job.timer.timeout.connect(lambda name=job.name: self.run(name))
+            job.timer.start()
+        return job
+
+    def load(self, path):
+        # plugins.json: [{"name", "target", "interval", "timeout", "kwargs"}, ...]
+        with open(path, encoding="utf-8") as f:
+            for spec in json.load(f):
+                self.add_job(PluginJob(spec["name"], spec["target"], spec.get("kwargs"),
+                                       spec.get("interval"), spec.get("timeout", 60.0)))
+                if spec.get("run_at_start"):
+                    self.run(spec["name"])
+
+    def run(self, name):
+        # Una tarea no se solapa consigo misma
+        if name in self.running or name in self.queued:
+            log.debug("Plugin '%s' ya está en marcha", name)
+            return
+        if len(self.running) >= self.max_workers:
+            self.queued.append(name)
+            return
+        self.start(self.jobs[name])
+
+    def start(self, job):
+        receiver, sender = self.context.Pipe(duplex=False)
+        process = self.context.Process(target=run_plugin, args=(job.target, job.kwargs, sender),
+                                       name=f"plugin-{job.name}", daemon=True)
+        process.start()
+        sender.close()  # el extremo de escritura solo lo usa el hijo
+        self.running[job.name] = PluginRun(job, process, receiver)
+        log.debug("Plugin '%s' iniciado (pid %d)", job.name, process.pid)
+        if not self.poll_timer.isActive():
+            self.poll_timer.start()
+
+    def cancel(self, name):
+        if name in self.queued:
+            self.queued.remove(name)
+            self.finished.emit(name, False, "cancelado")
+        elif name in self.running:
+            self.stop(self.running[name], "cancelado")
+
+    def poll(self):
+        now = time.monotonic()
+        for run in list(self.running.values()):
+            # Leer antes de mirar si terminó: un resultado grande mantiene al
+            # hijo esperando en la tubería hasta que se lee
+            try:
+                if run.result is None and run.conn.poll():
+                    run.result = run.conn.recv()
+            except (EOFError, OSError):
+                pass
+            if run.result is not None or not run.process.is_alive():
+                run.process.join(1)
+                if run.result is None:
+                    run.result = ("error", f"el proceso terminó con código {run.process.exitcode}")
+                self.finish(run, run.result[0] == "ok", run.result[1])
+            elif now - run.started > run.job.timeout:
+                self.stop(run, "timeout")
+        if not self.running:
+            self.poll_timer.stop()
+
+    def stop(self, run, reason):
+        run.process.terminate()
+        run.process.join(1)
+        if run.process.is_alive():
+            run.process.kill()
+            run.process.join()
+        self.finish(run, False, reason)
+
+    def finish(self, run, ok, value):
+        del self.running[run.job.name]
+        run.conn.close()
+        elapsed = time.monotonic() - run.started
+        if ok:
+            log.debug("Plugin '%s' terminado en %.1fs", run.job.name, elapsed)
+        else:
+            log.warning("Plugin '%s' falló tras %.1fs: %s", run.job.name, elapsed, value)
+        self.finished.emit(run.job.name, ok, value)
+        while self.queued and len(self.running) < self.max_workers:
+            self.start(self.jobs[self.queued.popleft()])
+
+    def shutdown(self):
+        for job in self.jobs.values():
+            if job.timer is not None:
+                job.timer.stop()
+        self.queued.clear()
+        for run in list(self.running.values()):
+            self.stop(run, "cancelado")
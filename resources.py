@@ -0,0 +1,69 @@
+import os
+import gc
+import tracemalloc
+
+from PyQt5.QtCore import QObject
+from PyQt5.QtWidgets import QApplication
+
+import sprites
+
+# Contabilidad de recursos para detectar fugas en sesiones largas: objetos Qt
+# vivos, bytes de los fotogramas en caché y memoria de Python. Lo usan la
+# superposición de rendimiento, la exportación JSON y benchmarks/soak.py.
+
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def rss_bytes():
+    # Memoria residente actual (solo Linux; None en otros sistemas)
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def qobject_count():
+    # Ventanas (incluidos menús y diálogos) y todos sus descendientes
+    app = QApplication.instance()
+    if app is None:
+        return 0, 0
+    windows = app.topLevelWidgets()
+    return len(windows), sum(len(w.findChildren(QObject)) + 1 for w in windows)
+
+
+def pixmap_bytes():
+    # Fotogramas en caché de todos los tamaños (incluidos los reflejados)
+    total = 0
+    count = 0
+    for sprite_set in sprites._registry.values():
+        for frame in sprite_set.frames.values():
+            pixmap = frame.pixmap
+            total += pixmap.width() * pixmap.height() * pixmap.depth() // 8
+            count += 1
+    return count, total
+
+
+def snapshot(full=False):
+    # full=True añade el recuento del recolector, que tarda unos milisegundos
+    windows, qobjects = qobject_count()
+    pixmaps, pixmap_total = pixmap_bytes()
+    result = {
+        "windows": windows,
+        "qobjects": qobjects,
+        "pixmaps": pixmaps,
+        "pixmap_bytes": pixmap_total,
+        "rss_bytes": rss_bytes(),
+    }
+    if tracemalloc.is_tracing():
+        result["python_heap_bytes"], result["python_heap_peak_bytes"] = tracemalloc.get_traced_memory()
+    if full:
+        result["gc_objects"] = len(gc.get_objects())
+    return result
+
+
+def overlay_line():
+    s = snapshot()
+    rss = s["rss_bytes"]
+    rss_text = f" rss {rss / 2**20:.0f}MB" if rss is not None else ""
+    return f"qobj {s['qobjects']} pix {s['pixmap_bytes'] / 2**20:.1f}MB{rss_text}"
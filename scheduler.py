@@ -0,0 +1,131 @@
+import math
+from PyQt5.QtCore import Qt, QObject, QTimer, QElapsedTimer
+
+from petlog import log
+from metrics import FrameStats
+from session import SessionMonitor
+from interactions import InteractionWorld
+
+
+class PetScheduler(QObject):
+    # Un único timer para todos los pingüinos: la física avanza con un paso
+    # fijo común y cada tick de dibujado recorre a todos los pingüinos en lote.
+    #
+    # El ritmo se adapta a lo que hay que hacer: render_hz mientras algún
+    # pingüino se mueve o recibe entrada, solo el siguiente cambio de
+    # fotograma mientras todos están quietos, y ningún tick si no queda nada
+    # que animar (ocultos, tapados, sesión bloqueada o dormidos).
+
+    _shared = None
+
+    def __init__(self, render_hz=60, physics_hz=50, parent=None):
+        super().__init__(parent)
+        self.pets = []
+        self.render_hz = render_hz
+        self.interval_ms = max(1, round(1000 / render_hz))
+        self.physics_dt = 1.0 / physics_hz
+        self.accumulator = 0.0
+        self.full_rate = False
+        self.clock = QElapsedTimer()
+        self.timer = QTimer(self)
+        self.timer.setTimerType(Qt.PreciseTimer)
+        self.timer.timeout.connect(self.tick)
+        self.stats = FrameStats(1.0 / render_hz)
+        self.world = InteractionWorld()
+        self.session = SessionMonitor.shared()
+        self.session.pausedChanged.connect(self.onSessionPaused)
+
+    @classmethod
+    def shared(cls, **options):
+        # Planificador por defecto del proceso; las opciones (render_hz,
+        # physics_hz) solo cuentan la primera vez
+        if cls._shared is None:
+            cls._shared = cls(**options)
+        return cls._shared
+
+    def add(self, pet):
+        self.pets.append(pet)
+        self.wake()
+
+    def remove(self, pet):
+        if pet in self.pets:
+            self.pets.remove(pet)
+        self.world.remove(pet.engine)
+        if not self.pets:
+            self.sleep()
+
+    def wake(self):
+        # Entrada, cambio de estado o ventana visible de nuevo: ritmo completo
+        if not self.pets or self.session.paused:
+            return
+        if not self.timer.isActive():
+            # Tras dormir no se recupera el tiempo perdido
+            self.clock.start()
+            self.accumulator = 0.0
+            self.stats.last_tick = None
+            log.debug("Planificador activo: dibujado cada %dms, física cada %.0fms",
+                      self.interval_ms, self.physics_dt * 1000)
+        if not self.full_rate or not self.timer.isActive():
+            self.full_rate = True
+            self.stats.set_expected_interval(self.interval_ms / 1000.0)
+            self.timer.start(self.interval_ms)
+
+    def sleep(self):
+        if self.timer.isActive():
+            self.timer.stop()
+            self.full_rate = False
+            log.debug("Planificador en reposo")
+
+    def onSessionPaused(self, paused):
+        if paused:
+            self.sleep()
+        else:
+            self.wake()
+
+    def tick(self):
+        started = self.stats.tick_started()
+        # Acumular el tiempo real transcurrido y consumirlo en pasos fijos.
+        # Se limita para no encadenar cientos de pasos tras una suspensión.
+        self.accumulator += min(self.clock.restart() / 1000.0, 0.25)
+        steps = int(self.accumulator / self.physics_dt)
+        self.accumulator -= steps * self.physics_dt
+        alpha = self.accumulator / self.physics_dt
+
+        # Solo los visibles avanzan y chocan entre sí
+        pets = []
+        for pet in self.pets:
+            if pet.isPaused():
+                self.world.remove(pet.engine)
+            else:
+                self.world.add(pet.engine)
+                pets.append(pet)
+                pet.stepAnimation(steps)
+        # Colisiones y golpes entre pingüinos sobre las posiciones ya
+        # avanzadas, en una pasada para todos; si hubo alguno hay que seguir
+        # a ritmo completo para dibujarlo
+        next_wakeup = None
+        if self.world.resolve():
+            next_wakeup = 0.0
+        # Cada pingüino dice cuándo necesita el siguiente tick: 0 = ya (ritmo
+        # completo), None = nada que animar, o los segundos que puede esperar
+        for pet in pets:
+            pet.drawAnimation(alpha)
+            wait = pet.nextWakeup()
+            if wait is not None and (next_wakeup is None or wait < next_wakeup):
+                next_wakeup = wait
+        self.stats.tick_finished(started)
+
+        if next_wakeup is None:
+            self.sleep()
+        elif next_wakeup * 1000 <= self.interval_ms:
+            if not self.full_rate:
+                self.wake()
+        else:
+            # Todos quietos: despertar justo en el paso de física que cambia
+            # de fotograma, descontando el tiempo ya acumulado
+            self.full_rate = False
+            steps_needed = max(1, math.ceil(next_wakeup / self.physics_dt))
+            wait = steps_needed * self.physics_dt - self.accumulator
+            interval = max(self.interval_ms, math.ceil(wait * 1000))
+            self.stats.set_expected_interval(interval / 1000.0)
+            self.timer.start(interval)
@@ -1,23 +1,28 @@
-# from selenium import webdriver
-# from selenium.webdriver.common.by import By
-# from selenium.webdriver.common.keys import Keys
-# import time
+import time
 
-# browser = webdriver.Chrome()
-# browser.get("https://tu_empresa.woffu.com/")
+# Plugin de fichaje en Woffu con Selenium. Se ejecuta en un proceso aparte a
+# través de plugins.PluginRuntime (target "scrap_waffu:fichar"), así que las
+# esperas del navegador no bloquean la animación.
 
-# # Inicio de sesión
-# usuario = browser.find_element(By.ID, "username")
-# password = browser.find_element(By.ID, "password")
 
-# usuario.send_keys("tu_usuario")
-# password.send_keys("tu_contraseña", Keys.ENTER)
+def fichar(url, usuario, password, selector_boton, espera=5):
+    # Selenium solo se importa en el proceso del plugin
+    from selenium import webdriver
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.common.keys import Keys
 
-# time.sleep(5)  # espera que cargue la página
+    browser = webdriver.Chrome()
+    try:
+        browser.get(url)
 
-# # Automáticamente hacer clic en botón de fichaje (entrada/salida)
-# boton_fichar = browser.find_element(By.CSS_SELECTOR, "selector_del_boton_fichaje")
-# boton_fichar.click()
+        # Inicio de sesión
+        browser.find_element(By.ID, "username").send_keys(usuario)
+        browser.find_element(By.ID, "password").send_keys(password, Keys.ENTER)
 
-# # cerrar navegador
-# browser.quit()
+        time.sleep(espera)  # espera que cargue la página
+
+        # Hacer clic en el botón de fichaje (entrada/salida)
+        browser.find_element(By.CSS_SELECTOR, selector_boton).click()
+        return "fichaje realizado"
+    finally:
+        browser.quit()
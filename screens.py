@@ -0,0 +1,60 @@
+from PyQt5.QtCore import QObject, QRect, pyqtSignal
+from PyQt5.QtGui import QGuiApplication
+
+from petlog import log
+
+
+class ScreenBounds(QObject):
+    # Límites del escritorio en caché: el rectángulo que envuelve la geometría
+    # disponible de todos los monitores. Solo se recalcula cuando Qt avisa de
+    # un cambio (pantalla añadida/quitada o geometría modificada), nunca por
+    # tick.
+    #
+    # Es una aproximación: con monitores de distinto tamaño o desalineados,
+    # el rectángulo incluye zonas que no están en ninguna pantalla, y el slide
+    # puede entrar en ellas antes de rebotar. El motor rebota contra un único
+    # rectángulo, que es lo que hace barato el paso de física.
+
+    changed = pyqtSignal(object)  # (izquierda, arriba, derecha, abajo)
+
+    _shared = None
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        app = QGuiApplication.instance()
+        app.screenAdded.connect(self.onScreenAdded)
+        app.screenRemoved.connect(self.onScreenRemoved)
+        for screen in app.screens():
+            self.watch(screen)
+        self.bounds = (0, 0, 0, 0)
+        self.refresh()
+
+    @classmethod
+    def shared(cls):
+        if cls._shared is None:
+            cls._shared = cls()
+        return cls._shared
+
+    def watch(self, screen):
+        screen.geometryChanged.connect(self.refresh)
+        screen.availableGeometryChanged.connect(self.refresh)
+
+    def onScreenAdded(self, screen):
+        self.watch(screen)
+        self.refresh()
+
+    def onScreenRemoved(self, screen):
+        # La pantalla puede seguir en la lista mientras se emite la señal
+        self.refresh(exclude=screen)
+
+    def refresh(self, *args, exclude=None):
+        # QRect.united da el rectángulo envolvente, no la unión exacta
+        rect = QRect()
+        for screen in QGuiApplication.screens():
+            if screen is not exclude:
+                rect = rect.united(screen.availableGeometry())
+        bounds = (rect.left(), rect.top(), rect.left() + rect.width(), rect.top() + rect.height())
+        if bounds != self.bounds:
+            self.bounds = bounds
+            log.debug("Límites de pantalla: %s", bounds)
+            self.changed.emit(bounds)
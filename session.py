@@ -0,0 +1,60 @@
+from PyQt5.QtCore import Qt, QObject, pyqtSignal, pyqtSlot
+from PyQt5.QtGui import QGuiApplication
+
+from petlog import log
+
+try:
+    from PyQt5.QtDBus import QDBusConnection
+except ImportError:  # QtDBus solo existe en Linux/BSD
+    QDBusConnection = None
+
+# Servicios de salvapantallas que avisan cuando la sesión se bloquea
+SCREENSAVER_SERVICES = (
+    ("org.freedesktop.ScreenSaver", "/org/freedesktop/ScreenSaver", "org.freedesktop.ScreenSaver"),
+    ("org.gnome.ScreenSaver", "/org/gnome/ScreenSaver", "org.gnome.ScreenSaver"),
+)
+
+
+class SessionMonitor(QObject):
+    # Avisa cuando no tiene sentido animar: sesión bloqueada (salvapantallas
+    # por D-Bus, si está disponible) o aplicación suspendida/oculta.
+
+    pausedChanged = pyqtSignal(bool)
+
+    _shared = None
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.locked = False
+        self.suspended = False
+        QGuiApplication.instance().applicationStateChanged.connect(self.onApplicationState)
+        if QDBusConnection is not None:
+            bus = QDBusConnection.sessionBus()
+            if bus.isConnected():
+                for service, path, interface in SCREENSAVER_SERVICES:
+                    bus.connect(service, path, interface, "ActiveChanged", self.onScreenSaverActive)
+
+    @classmethod
+    def shared(cls):
+        if cls._shared is None:
+            cls._shared = cls()
+        return cls._shared
+
+    @property
+    def paused(self):
+        return self.locked or self.suspended
+
+    def setFlags(self, locked, suspended):
+        was_paused = self.paused
+        self.locked = locked
+        self.suspended = suspended
+        if self.paused != was_paused:
+            log.debug("Sesión %s", "en pausa" if self.paused else "reanudada")
+            self.pausedChanged.emit(self.paused)
+
+    def onApplicationState(self, state):
+        self.setFlags(self.locked, state in (Qt.ApplicationSuspended, Qt.ApplicationHidden))
+
+    @pyqtSlot(bool)
+    def onScreenSaverActive(self, active):
+        self.setFlags(active, self.suspended)
@@ -0,0 +1,315 @@
+import os
+import re
+import atexit
+import sys
+import time
+from PyQt5.QtGui import QImage, QPixmap, QTransform, QRegion
+from PyQt5.QtCore import Qt, QObject, QRect, QRunnable, QThreadPool, QCoreApplication, pyqtSignal
+from PyQt5 import sip
+
+from petlog import log
+from animations import load_manifest
+
+IMAGES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "images")
+
+# Archivos de cada animación (en orden de reproducción), según animations.json
+_manifest = load_manifest()
+ANIMATION_FILES = _manifest.files_by_name()
+
+# Animación que se carga de forma síncrona para poder mostrar el pingüino ya
+FIRST_ANIMATION = _manifest.names[_manifest.initial]
+
+# Pool propio para decodificar: Qt usa el pool global para repartir el escalado
+# suave, y si nuestras tareas lo ocupan el hilo de la interfaz se queda
+# esperando a que quede un hilo libre.
+_pool = None
+
+
+def pool():
+    global _pool
+    if _pool is None:
+        _pool = QThreadPool()
+        # Al salir (de la aplicación o del intérprete) se descartan las tareas
+        # sin empezar y se espera a las que están en marcha, antes de que se
+        # destruyan los objetos a los que avisan
+        app = QCoreApplication.instance()
+        if app is not None:
+            app.aboutToQuit.connect(drain_pool)
+        atexit.register(drain_pool)
+    return _pool
+
+
+def drain_pool():
+    # En atexit el pool puede haberse destruido ya con el resto de Qt
+    if _pool is not None and not sip.isdeleted(_pool):
+        _pool.clear()
+        _pool.waitForDone()
+
+
+def load_image(path, size):
+    # Se trabaja con QImage porque, a diferencia de QPixmap, puede usarse
+    # fuera del hilo de la interfaz
+    image = QImage(path)
+    if image.isNull():
+        log.warning("Error al cargar %s", path)
+        return None
+    # Escalar todas las imágenes a un tamaño fijo (size x size)
+    return image.scaled(size, size, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+
+
+# Posición del byte alfa dentro de cada píxel ARGB32 en memoria
+ALPHA_OFFSET = 3 if sys.byteorder == "little" else 0
+
+
+def trim_image(image):
+    # Recorta el relleno transparente. Devuelve (imagen recortada, x, y, ancho
+    # original, bandas): x/y es la posición del recorte dentro del fotograma
+    # completo y las bandas (ver opaque_bands) sus píxeles visibles.
+    image = image.convertToFormat(QImage.Format_ARGB32_Premultiplied)
+    width, height, bpl = image.width(), image.height(), image.bytesPerLine()
+    bits = image.constBits()
+    bits.setsize(bpl * height)
+    data = bytes(bits)
+    top = bottom = None
+    left, right = width, 0
+    for row in range(height):
+        start = row * bpl + ALPHA_OFFSET
+        alpha = data[start:start + width * 4:4]
+        opaque = alpha.lstrip(b"\0")
+        if not opaque:
+            continue
+        if top is None:
+            top = row
+        bottom = row
+        left = min(left, width - len(opaque))
+        right = max(right, len(alpha.rstrip(b"\0")))
+    if top is None:
+        # Fotograma totalmente transparente
+        return image.copy(0, 0, 1, 1), 0, 0, width, []
+    image = image.copy(left, top, right - left, bottom - top + 1)
+    return image, left, top, width, opaque_bands(image)
+
+
+# Tramos de píxeles no transparentes dentro de la fila de alfas
+OPAQUE_RUN = re.compile(b"[^\0]+")
+
+
+def opaque_bands(image):
+    # Píxeles visibles de un fotograma recortado (ARGB32 premultiplicado):
+    # lista de [fila inicial, fila final, [x0, x1, x0, x1, ...]], juntando en
+    # una banda las filas iguales seguidas. Son datos planos: se calculan en
+    # el hilo que decodifica y se guardan tal cual en el índice del atlas.
+    w, h, bpl = image.width(), image.height(), image.bytesPerLine()
+    bits = image.constBits()
+    bits.setsize(bpl * h)
+    data = bytes(bits)
+    bands = []
+    band_start, band_runs = 0, []
+    for row in range(h):
+        start = row * bpl + ALPHA_OFFSET
+        runs = [x for m in OPAQUE_RUN.finditer(data[start:start + w * 4:4]) for x in m.span()]
+        if runs != band_runs:
+            if band_runs:
+                bands.append([band_start, row, band_runs])
+            band_start, band_runs = row, runs
+    if band_runs:
+        bands.append([band_start, h, band_runs])
+    return bands
+
+
+def band_region(bands, x, y, w, mirrored=False):
+    # Región de las bandas de un fotograma de ancho w colocado en x/y del
+    # widget (reflejado si hace falta). Solo crea rectángulos, sin mirar
+    # píxeles; setRects quiere cada banda ordenada de izquierda a derecha.
+    rects = []
+    for top, bottom, runs in bands:
+        height = bottom - top
+        if mirrored:
+            for i in range(len(runs) - 2, -1, -2):
+                rects.append(QRect(x + w - runs[i + 1], y + top, runs[i + 1] - runs[i], height))
+        else:
+            for i in range(0, len(runs), 2):
+                rects.append(QRect(x + runs[i], y + top, runs[i + 1] - runs[i], height))
+    if not rects:
+        # Fotograma vacío: una región vacía quitaría la máscara entera
+        return QRegion(x, y, 1, 1)
+    region = QRegion()
+    region.setRects(rects)
+    return region
+
+
+class Frame:
+    # Fotograma recortado, el rectángulo que ocupa dentro del widget y la
+    # máscara de sus píxeles visibles (para que los clics en lo transparente
+    # lleguen a la ventana de debajo). La máscara se crea la primera vez que
+    # se pide, así que cargar los sprites no cuesta nada por ella.
+
+    __slots__ = ("pixmap", "rect", "bands", "mirrored", "_mask")
+
+    def __init__(self, pixmap, x, y, bands, mirrored=False):
+        self.pixmap = pixmap
+        self.rect = QRect(x, y, pixmap.width(), pixmap.height())
+        self.bands = bands
+        self.mirrored = mirrored
+        self._mask = None
+
+    @property
+    def mask(self):
+        if self._mask is None:
+            rect = self.rect
+            self._mask = band_region(self.bands, rect.x(), rect.y(), rect.width(), self.mirrored)
+        return self._mask
+
+
+class DecodeTask(QRunnable):
+    # Decodifica y escala una animación completa en el pool de hilos
+
+    def __init__(self, sprites, state):
+        super().__init__()
+        self.sprites = sprites
+        self.state = state
+
+    def run(self):
+        images = []
+        for name in ANIMATION_FILES[self.state]:
+            image = load_image(os.path.join(IMAGES_DIR, name), self.sprites.size)
+            if image is not None:
+                images.append(trim_image(image))
+        # La señal se entrega en el hilo de la interfaz (conexión en cola).
+        # Si el programa ya está saliendo el SpriteSet puede no existir: una
+        # excepción aquí (en un hilo de Qt) abortaría el proceso
+        try:
+            self.sprites.decoded.emit(self.state, images)
+        except RuntimeError:
+            pass
+
+
+class AtlasTask(QRunnable):
+    # Escribe el atlas en disco a partir de los fotogramas ya escalados
+
+    def __init__(self, images, size):
+        super().__init__()
+        self.images = images
+        self.size = size
+
+    def run(self):
+        import atlas
+        try:
+            atlas.save_atlas(self.images, self.size)
+        except OSError as e:
+            log.warning("No se pudo guardar el atlas: %s", e)
+
+
+class SpriteSet(QObject):
+    # Fotogramas decodificados y escalados una sola vez por proceso y tamaño.
+    # Todos los pingüinos del mismo tamaño comparten la misma instancia.
+
+    decoded = pyqtSignal(str, list)  # uso interno: hilo de trabajo -> interfaz
+    animationLoaded = pyqtSignal(str)  # la animación ya tiene fotogramas en caché
+
+    def __init__(self, size):
+        super().__init__()
+        self.size = size
+        self.refcount = 0
+        self.table = _manifest  # animaciones (compiladas) de las que salen los fotogramas
+        self.animations = {}
+        # Caché por (estado, orientación, índice de fotograma)
+        self.frames = {}
+        self.pending = set()
+        self.decoded.connect(self.onDecoded)
+
+    def load(self):
+        import atlas  # atlas usa las rutas de este módulo
+        started = time.perf_counter()
+
+        # Con un atlas válido en disco no hace falta decodificar ni escalar nada
+        images = atlas.load_atlas(self.size)
+        if images is not None:
+            for state, frames in images.items():
+                self.store(state, frames)
+            log.debug("Sprites de %dpx cargados desde el atlas en %.1fms",
+                      self.size, (time.perf_counter() - started) * 1000)
+            return
+
+        # La primera animación se carga ya para que el pingüino aparezca enseguida
+        images = []
+        for name in ANIMATION_FILES[FIRST_ANIMATION]:
+            image = load_image(os.path.join(IMAGES_DIR, name), self.size)
+            if image is not None:
+                images.append(trim_image(image))
+        self.store(FIRST_ANIMATION, images)
+        self.decoded_images = {FIRST_ANIMATION: images}
+
+        # El resto se decodifica y escala en segundo plano
+        self.load_started = started
+        for state in ANIMATION_FILES:
+            if state != FIRST_ANIMATION:
+                self.pending.add(state)
+                pool().start(DecodeTask(self, state))
+        log.debug("Animación '%s' lista en %.1fms, resto en segundo plano",
+                  FIRST_ANIMATION, (time.perf_counter() - started) * 1000)
+
+    def store(self, state, images):
+        # images: lista de (imagen recortada, x, y, ancho original, bandas).
+        # Las versiones reflejadas se generan una sola vez aquí, de modo que
+        # cada tick solo tiene que buscar el fotograma ya preparado. Las
+        # bandas de las máscaras ya vienen calculadas (del hilo que decodifica
+        # o del atlas): en el hilo de la interfaz no se recorren píxeles.
+        mirror = QTransform().scale(-1, 1)
+        frames = []
+        for index, (image, x, y, width, bands) in enumerate(images):
+            pix = QPixmap.fromImage(image)
+            frame = Frame(pix, x, y, bands)
+            frames.append(frame)
+            self.frames[(state, "right", index)] = frame
+            # Al reflejar, el recorte queda a la misma distancia del borde opuesto
+            self.frames[(state, "left", index)] = Frame(
+                pix.transformed(mirror), width - x - pix.width(), y, bands, mirrored=True)
+        self.animations[state] = frames
+
+    def onDecoded(self, state, images):
+        self.pending.discard(state)
+        if self.refcount <= 0:
+            return  # el registro ya se liberó mientras se decodificaba
+        self.store(state, images)
+        self.decoded_images[state] = images
+        self.animationLoaded.emit(state)
+        if not self.pending:
+            log.debug("Sprites de %dpx cargados (%d fotogramas) en %.1fms",
+                      self.size, len(self.frames), (time.perf_counter() - self.load_started) * 1000)
+            # Guardar el atlas para que el próximo arranque no decodifique PNG
+            ordered = {state: self.decoded_images[state] for state in ANIMATION_FILES}
+            self.decoded_images = {}
+            pool().start(AtlasTask(ordered, self.size))
+
+    def isLoaded(self):
+        return not self.pending
+
+    def waitUntilLoaded(self):
+        # Bloquea hasta tener todas las animaciones (útil sin bucle de eventos)
+        while self.pending:
+            pool().waitForDone(50)
+            QCoreApplication.processEvents()
+
+
+# Registro de todo el proceso: tamaño -> SpriteSet
+_registry = {}
+
+
+def acquire(size=200):
+    sprites = _registry.get(size)
+    if sprites is None:
+        sprites = SpriteSet(size)
+        _registry[size] = sprites
+        sprites.load()
+    sprites.refcount += 1
+    return sprites
+
+
+def release(sprites):
+    sprites.refcount -= 1
+    if sprites.refcount <= 0 and _registry.get(sprites.size) is sprites:
+        # Nadie más usa estos fotogramas: liberar los pixmaps
+        del _registry[sprites.size]
+        sprites.animations.clear()
+        sprites.frames.clear()